@@ -17,17 +17,23 @@ import json
 import os
 from datetime import datetime, timedelta
 
-# Set random seed for reproducibility
-np.random.seed(42)
-random.seed(42)
-
 
 class ExerciseDataGenerator:
     """
     Generates synthetic exercise data for model training and testing.
     """
     
-    def __init__(self):
+    def __init__(self, seed=42):
+        """
+        Initialize the generator and its synthetic subject profiles.
+        
+        Args:
+            seed: Seed for this generator's own random number generators, so
+                  datasets are reproducible without touching global state
+        """
+        self._rng = random.Random(seed)
+        self._np_rng = np.random.RandomState(seed)  # Same stream as np.random.seed(seed)
+        
         # Define exercise types
         self.exercise_types = [
             "squat", "deadlift", "bench_press", "shoulder_press",  # Strength
@@ -62,42 +68,42 @@ class ExerciseDataGenerator:
         
         for i in range(num_subjects):
             # Generate basic demographic information
-            gender = random.choice(["male", "female"])
+            gender = self._rng.choice(["male", "female"])
             
             if gender == "male":
-                height = random.normalvariate(175, 10)  # cm
-                weight = random.normalvariate(75, 15)   # kg
-                body_fat = random.normalvariate(18, 5)  # %
-                muscle_mass = random.normalvariate(35, 5)  # %
+                height = self._rng.normalvariate(175, 10)  # cm
+                weight = self._rng.normalvariate(75, 15)   # kg
+                body_fat = self._rng.normalvariate(18, 5)  # %
+                muscle_mass = self._rng.normalvariate(35, 5)  # %
             else:
-                height = random.normalvariate(163, 8)   # cm
-                weight = random.normalvariate(65, 12)   # kg
-                body_fat = random.normalvariate(25, 6)  # %
-                muscle_mass = random.normalvariate(30, 4)  # %
+                height = self._rng.normalvariate(163, 8)   # cm
+                weight = self._rng.normalvariate(65, 12)   # kg
+                body_fat = self._rng.normalvariate(25, 6)  # %
+                muscle_mass = self._rng.normalvariate(30, 4)  # %
             
-            age = random.randint(18, 70)
+            age = self._rng.randint(18, 70)
             
             # Fitness level (1-5 scale)
-            fitness_level = max(1, min(5, int(np.random.normal(3, 1))))
+            fitness_level = max(1, min(5, int(self._np_rng.normal(3, 1))))
             
             # Training experience (years)
-            training_experience = max(0, min(30, int(age/3) - random.randint(3, 10)))
+            training_experience = max(0, min(30, int(age/3) - self._rng.randint(3, 10)))
             
             # Recovery capacity (1-10 scale, higher is better)
-            recovery_capacity = max(1, min(10, int(np.random.normal(7, 2))))
+            recovery_capacity = max(1, min(10, int(self._np_rng.normal(7, 2))))
             
             # Generate physiological baseline parameters
-            resting_hr = int(random.normalvariate(65, 8))
+            resting_hr = int(self._rng.normalvariate(65, 8))
             # Decrease resting HR based on fitness level
             resting_hr -= (fitness_level - 3) * 3
             resting_hr = max(40, min(90, resting_hr))
             
             max_hr = 220 - age
-            hrv_baseline = random.normalvariate(60, 15)
+            hrv_baseline = self._rng.normalvariate(60, 15)
             
             # TENS response parameters
-            tens_sensitivity = random.normalvariate(1.0, 0.2)
-            tens_effectiveness = random.normalvariate(0.7, 0.15)
+            tens_sensitivity = self._rng.normalvariate(1.0, 0.2)
+            tens_effectiveness = self._rng.normalvariate(0.7, 0.15)
             
             profile = {
                 "id": f"SUBJ_{i:03d}",
@@ -115,15 +121,15 @@ class ExerciseDataGenerator:
                     "resting_hr": resting_hr,
                     "max_hr": max_hr,
                     "hrv_baseline": round(hrv_baseline, 1),
-                    "vo2max": round(random.normalvariate(35 + (fitness_level * 5), 5), 1),
-                    "lactate_threshold": round(random.normalvariate(60 + (fitness_level * 5), 8), 1),
-                    "respiratory_rate": round(random.normalvariate(16, 2), 1)
+                    "vo2max": round(self._rng.normalvariate(35 + (fitness_level * 5), 5), 1),
+                    "lactate_threshold": round(self._rng.normalvariate(60 + (fitness_level * 5), 8), 1),
+                    "respiratory_rate": round(self._rng.normalvariate(16, 2), 1)
                 },
                 "stimulation_response": {
                     "tens_sensitivity": round(tens_sensitivity, 2),
                     "tens_effectiveness": round(tens_effectiveness, 2),
-                    "preferred_frequency": random.choice([2, 5, 10, 20, 50, 100]),
-                    "adaptation_rate": round(random.normalvariate(0.5, 0.15), 2)
+                    "preferred_frequency": self._rng.choice([2, 5, 10, 20, 50, 100]),
+                    "adaptation_rate": round(self._rng.normalvariate(0.5, 0.15), 2)
                 }
             }
             
@@ -305,15 +311,15 @@ class ExerciseDataGenerator:
         
         for i in range(num_sessions):
             # Randomly select a subject
-            subject = random.choice(self.subject_profiles)
+            subject = self._rng.choice(self.subject_profiles)
             subject_id = subject["id"]
             
             # Randomly determine if stimulation will be used (50% chance)
-            with_stimulation = random.choice([True, False])
+            with_stimulation = self._rng.choice([True, False])
             
             # Randomly select exercise type and intensity
-            exercise_type = random.choice(self.exercise_types)
-            intensity = random.choice(self.intensity_levels)
+            exercise_type = self._rng.choice(self.exercise_types)
+            intensity = self._rng.choice(self.intensity_levels)
             
             # Generate session
             session = self.generate_exercise_session(
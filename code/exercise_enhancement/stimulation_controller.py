@@ -13,6 +13,11 @@ import numpy as np
 from enum import Enum
 import logging
 
+try:
+    from numba import njit
+except ImportError:  # Numba is optional; the phase kernel then runs as plain Python
+    njit = None
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, 
                     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -34,6 +39,181 @@ class StimulationType(Enum):
     HAPTIC = 3    # Vibration-based tactile feedback
     THERMAL = 4   # Temperature-based feedback
 
+# Per-phase stimulation settings, built once and shared by all controllers
+# TENS frequency (Hz) and pulse width (μs) as (base, change per unit of fatigue)
+TENS_PHASE_FREQUENCY = {
+    ExercisePhase.WARMUP: (25.0, -15.0),    # Low frequency for muscle preparation
+    ExercisePhase.MAIN: (35.0, -10.0),      # Higher frequency for power output
+    ExercisePhase.PEAK: (50.0, -15.0),      # Maximum frequency for peak performance
+    ExercisePhase.COOLDOWN: (20.0, 0.0),    # Medium-low frequency for controlled cooldown
+    ExercisePhase.RECOVERY: (5.0, 0.0)      # Low frequency for recovery enhancement
+}
+
+TENS_PHASE_PULSE_WIDTH = {
+    ExercisePhase.WARMUP: (150.0, 0.0),
+    ExercisePhase.MAIN: (200.0, 50.0),
+    ExercisePhase.PEAK: (250.0, 0.0),
+    ExercisePhase.COOLDOWN: (200.0, 0.0),
+    ExercisePhase.RECOVERY: (300.0, 0.0)
+}
+
+TENS_PHASE_PATTERN = {
+    ExercisePhase.WARMUP: "rhythmic",
+    ExercisePhase.MAIN: "continuous",
+    ExercisePhase.PEAK: "burst",
+    ExercisePhase.COOLDOWN: "wave",
+    ExercisePhase.RECOVERY: "long_pulse"
+}
+
+TENS_PHASE_INTENSITY = {
+    ExercisePhase.WARMUP: 0.3,
+    ExercisePhase.MAIN: 0.6,
+    ExercisePhase.PEAK: 0.8,
+    ExercisePhase.COOLDOWN: 0.4,
+    ExercisePhase.RECOVERY: 0.3
+}
+
+VISUAL_PHASE_COLORS = {
+    ExercisePhase.WARMUP: (0, 200, 255),    # Blue
+    ExercisePhase.MAIN: (0, 255, 0),        # Green
+    ExercisePhase.PEAK: (255, 0, 0),        # Red
+    ExercisePhase.COOLDOWN: (180, 180, 255), # Light blue
+    ExercisePhase.RECOVERY: (150, 255, 220)  # Mint green
+}
+
+VISUAL_PHASE_BRIGHTNESS = {
+    ExercisePhase.WARMUP: 0.5,
+    ExercisePhase.MAIN: 0.7,
+    ExercisePhase.PEAK: 0.9,
+    ExercisePhase.COOLDOWN: 0.6,
+    ExercisePhase.RECOVERY: 0.4
+}
+
+VISUAL_PHASE_PATTERN = {
+    ExercisePhase.WARMUP: "slow_pulse",
+    ExercisePhase.MAIN: "steady",
+    ExercisePhase.PEAK: "fast_pulse",
+    ExercisePhase.COOLDOWN: "wave",
+    ExercisePhase.RECOVERY: "gentle_fade"
+}
+
+# Binaural beat frequency based on desired brain state for each phase
+AUDIO_PHASE_FREQUENCY = {
+    ExercisePhase.WARMUP: 10.0,     # Alpha waves for focus
+    ExercisePhase.MAIN: 16.0,       # Beta waves for alertness
+    ExercisePhase.PEAK: 20.0,       # High beta for intensity
+    ExercisePhase.COOLDOWN: 8.0,    # Alpha/theta border for relaxation
+    ExercisePhase.RECOVERY: 6.0     # Theta waves for recovery
+}
+
+AUDIO_PHASE_VOLUME = {
+    ExercisePhase.WARMUP: 0.5,
+    ExercisePhase.MAIN: 0.6,
+    ExercisePhase.PEAK: 0.7,
+    ExercisePhase.COOLDOWN: 0.5,
+    ExercisePhase.RECOVERY: 0.4
+}
+
+# Warmup and cooldown use the user's preferred audio instead
+AUDIO_PHASE_PATTERN = {
+    ExercisePhase.MAIN: "rhythm",
+    ExercisePhase.PEAK: "motivational",
+    ExercisePhase.RECOVERY: "ambient"
+}
+
+HAPTIC_PHASE_INTENSITY = {
+    ExercisePhase.WARMUP: 0.4,
+    ExercisePhase.MAIN: 0.6,
+    ExercisePhase.PEAK: 0.8,
+    ExercisePhase.COOLDOWN: 0.5,
+    ExercisePhase.RECOVERY: 0.3
+}
+
+HAPTIC_PHASE_FREQUENCY = {
+    ExercisePhase.WARMUP: 40.0,
+    ExercisePhase.MAIN: 60.0,
+    ExercisePhase.PEAK: 80.0,
+    ExercisePhase.COOLDOWN: 50.0,
+    ExercisePhase.RECOVERY: 30.0
+}
+
+HAPTIC_PHASE_PATTERN = {
+    ExercisePhase.WARMUP: "rhythmic",
+    ExercisePhase.MAIN: "continuous",
+    ExercisePhase.PEAK: "pulsed",
+    ExercisePhase.COOLDOWN: "wave",
+    ExercisePhase.RECOVERY: "gentle"
+}
+
+THERMAL_PHASE_TEMPERATURE = {
+    ExercisePhase.WARMUP: 35.0,     # Warm
+    ExercisePhase.MAIN: 32.0,       # Neutral
+    ExercisePhase.PEAK: 30.0,       # Slight cooling
+    ExercisePhase.COOLDOWN: 28.0,   # Cooling
+    ExercisePhase.RECOVERY: 33.0    # Mild warming
+}
+
+def _by_phase_value(table):
+    """Values of a per-phase table as an array indexed by phase value"""
+    return np.array([table[phase] for phase in ExercisePhase])
+
+# Numeric tables as arrays for batch lookups by phase value
+TENS_FREQUENCY_BY_PHASE = _by_phase_value(TENS_PHASE_FREQUENCY)
+TENS_PULSE_WIDTH_BY_PHASE = _by_phase_value(TENS_PHASE_PULSE_WIDTH)
+TENS_INTENSITY_BY_PHASE = _by_phase_value(TENS_PHASE_INTENSITY)
+VISUAL_BRIGHTNESS_BY_PHASE = _by_phase_value(VISUAL_PHASE_BRIGHTNESS)
+AUDIO_VOLUME_BY_PHASE = _by_phase_value(AUDIO_PHASE_VOLUME)
+HAPTIC_INTENSITY_BY_PHASE = _by_phase_value(HAPTIC_PHASE_INTENSITY)
+THERMAL_TEMPERATURE_BY_PHASE = _by_phase_value(THERMAL_PHASE_TEMPERATURE)
+
+# Phase values as plain integers for the compiled phase kernel
+_WARMUP = ExercisePhase.WARMUP.value
+_MAIN = ExercisePhase.MAIN.value
+_PEAK = ExercisePhase.PEAK.value
+_COOLDOWN = ExercisePhase.COOLDOWN.value
+_RECOVERY = ExercisePhase.RECOVERY.value
+
+# Intensity band edges used for phase detection: low, moderate and high
+PHASE_INTENSITY_BOUNDS = np.array([0.3, 0.7])
+
+def _phase_sequence(band, initial_phase):
+    """
+    Step the exercise phase state machine through a sequence of intensity bands
+    
+    Counterpart of StimulationController._update_phase, working on phase
+    values instead of ExercisePhase members. Compiled with Numba when it is
+    installed.
+    
+    Args:
+        band: Intensity band per sample (0 low, 1 moderate, 2 high), see
+              PHASE_INTENSITY_BOUNDS
+        initial_phase: Phase value before the first sample
+        
+    Returns:
+        numpy.ndarray: Phase value after each sample
+    """
+    phase = np.empty(band.shape[0], dtype=np.int8)
+    current = initial_phase
+    for i in range(band.shape[0]):
+        if band[i] == 0:
+            if current == _MAIN or current == _PEAK:
+                current = _COOLDOWN
+            elif current == _COOLDOWN:
+                current = _RECOVERY
+            else:
+                current = _WARMUP
+        elif band[i] == 1:
+            current = _MAIN
+        else:
+            current = _PEAK
+        phase[i] = current
+    return phase
+
+# Not cached on disk: a cache written while this module is imported as
+# stimulation_controller fails to load under exercise_enhancement, and vice versa
+if njit is not None:
+    _phase_sequence = njit(_phase_sequence)
+
 class StimulationController:
     """
     Controls all aspects of stimulation delivery for the Smart Orb device
@@ -113,6 +293,33 @@ class StimulationController:
         intensity = max(0.0, min(1.0, heart_rate_reserve))
         
         # Determine exercise phase
+        self._update_phase(intensity)
+            
+        # Estimate fatigue level from EMG and heart rate data
+        hr_contribution = 0.4 * heart_rate_reserve
+        emg_contribution = 0.6 * self._analyze_emg_fatigue(emg_activity)
+        new_fatigue = hr_contribution + emg_contribution
+        
+        # Apply temporal smoothing to fatigue estimate
+        self.fatigue_level = 0.8 * self.fatigue_level + 0.2 * new_fatigue
+        
+        # Process impedance data to estimate hydration and muscle state
+        hydration_level = self._estimate_hydration(impedance_data)
+        
+        return {
+            "phase": self.current_phase,
+            "intensity": intensity,
+            "fatigue": self.fatigue_level,
+            "hydration": hydration_level
+        }
+    
+    def _update_phase(self, intensity):
+        """
+        Move to the exercise phase implied by the current exercise intensity
+        
+        Args:
+            intensity: Exercise intensity as a fraction of heart rate reserve
+        """
         if intensity < 0.3:
             if self.current_phase in [ExercisePhase.MAIN, ExercisePhase.PEAK]:
                 new_phase = ExercisePhase.COOLDOWN
@@ -129,23 +336,82 @@ class StimulationController:
         if new_phase != self.current_phase:
             logger.info(f"Exercise phase transition: {self.current_phase.name} -> {new_phase.name}")
             self.current_phase = new_phase
-            
-        # Estimate fatigue level from EMG and heart rate data
-        hr_contribution = 0.4 * heart_rate_reserve
-        emg_contribution = 0.6 * self._analyze_emg_fatigue(emg_activity)
-        new_fatigue = hr_contribution + emg_contribution
+    
+    def process_sensor_batch(self, sensor_data):
+        """
+        Process a sequence of physiological measurements in one call
         
-        # Apply temporal smoothing to fatigue estimate
-        self.fatigue_level = 0.8 * self.fatigue_level + 0.2 * new_fatigue
+        Equivalent to calling update_physiological_state followed by
+        adjust_stimulation for every sample, but the per-sample arithmetic is
+        done with NumPy; only the phase updates, which depend on the previous
+        phase, are stepped through in order by a compiled kernel.
         
-        # Process impedance data to estimate hydration and muscle state
-        hydration_level = self._estimate_hydration(impedance_data)
+        Args:
+            sensor_data: Dictionary of equal-length arrays with keys
+                         "heart_rate", "emg_activity", "gsr", "acceleration"
+                         and "impedance_data"
+        
+        Returns:
+            dict: Per-sample arrays of phase values, intensity, fatigue,
+                  hydration and the resulting stimulation parameters
+        """
+        heart_rate = np.asarray(sensor_data["heart_rate"], dtype=np.float64)
+        emg_activity = np.asarray(sensor_data["emg_activity"], dtype=np.float64)
+        impedance_data = np.asarray(sensor_data["impedance_data"], dtype=np.float64)
+        
+        # Exercise intensity based on heart rate reserve
+        max_hr = self.user_profile["max_heart_rate"]
+        rest_hr = self.user_profile["resting_heart_rate"]
+        heart_rate_reserve = (heart_rate - rest_hr) / (max_hr - rest_hr)
+        intensity = np.clip(heart_rate_reserve, 0.0, 1.0)
+        
+        # Unsmoothed fatigue estimate from heart rate and EMG
+        new_fatigue = 0.4 * heart_rate_reserve + 0.6 * self._analyze_emg_fatigue(emg_activity)
+        
+        # Hydration from single-frequency impedance values
+        hydration = np.clip((impedance_data - 400) / 200, 0.0, 1.0)
+        
+        # Temporal smoothing of the fatigue estimate, run as a first-order IIR
+        # filter that starts from the current fatigue level
+        from scipy.signal import lfilter
+        fatigue, _ = lfilter([0.2], [1.0, -0.8], new_fatigue, zi=[0.8 * self.fatigue_level])
+        if len(fatigue):
+            self.fatigue_level = float(fatigue[-1])
+        
+        # Phase transitions depend on the previous phase; the intensity bands
+        # they are driven by are found for all samples in one binary search pass
+        band = np.searchsorted(PHASE_INTENSITY_BOUNDS, intensity, side='right')
+        phase = _phase_sequence(band, self.current_phase.value)
+        
+        # Phase transition logging
+        previous = np.concatenate(([self.current_phase.value], phase[:-1]))
+        for i in np.flatnonzero(phase != previous).tolist():
+            logger.info(f"Exercise phase transition: {ExercisePhase(previous[i]).name} -> "
+                        f"{ExercisePhase(phase[i]).name}")
+        if len(phase):
+            self.current_phase = ExercisePhase(int(phase[-1]))
+        
+        # Leave the parameter dictionaries in sync with the final sample
+        self.adjust_stimulation()
+        
+        # Stimulation parameters for every sample, looked up by phase value
+        frequency = TENS_FREQUENCY_BY_PHASE[phase]
+        pulse_width = TENS_PULSE_WIDTH_BY_PHASE[phase]
+        tens_intensity = np.minimum(self.user_profile["max_tens_intensity"],
+                                    TENS_INTENSITY_BY_PHASE[phase] * (1.0 - 0.3 * fatigue))
         
         return {
-            "phase": self.current_phase,
+            "phase": phase,
             "intensity": intensity,
-            "fatigue": self.fatigue_level,
-            "hydration": hydration_level
+            "fatigue": fatigue,
+            "hydration": hydration,
+            "tens_frequency": frequency[:, 0] + frequency[:, 1] * fatigue,
+            "tens_pulse_width": pulse_width[:, 0] + pulse_width[:, 1] * fatigue,
+            "tens_intensity": tens_intensity,
+            "visual_brightness": VISUAL_BRIGHTNESS_BY_PHASE[phase],
+            "audio_volume": AUDIO_VOLUME_BY_PHASE[phase],
+            "haptic_intensity": HAPTIC_INTENSITY_BY_PHASE[phase],
+            "thermal_temp": THERMAL_TEMPERATURE_BY_PHASE[phase] - 2.0 * fatigue
         }
     
     def _analyze_emg_fatigue(self, emg_activity):
@@ -210,149 +476,43 @@ class StimulationController:
     
     def _adjust_tens_parameters(self):
         """Adjust TENS stimulation based on exercise phase and fatigue"""
-        # Base frequency selection on exercise phase
-        if self.current_phase == ExercisePhase.WARMUP:
-            # Low frequency for muscle preparation
-            self.tens_params["frequency"] = 10.0 + 15.0 * (1.0 - self.fatigue_level)
-            self.tens_params["pulse_width"] = 150.0
-            self.tens_params["pattern"] = "rhythmic"
-            
-        elif self.current_phase == ExercisePhase.MAIN:
-            # Higher frequency for power output
-            self.tens_params["frequency"] = 35.0 - 10.0 * self.fatigue_level
-            self.tens_params["pulse_width"] = 200.0 + 50.0 * self.fatigue_level
-            self.tens_params["pattern"] = "continuous"
-            
-        elif self.current_phase == ExercisePhase.PEAK:
-            # Maximum frequency for peak performance
-            self.tens_params["frequency"] = 50.0 - 15.0 * self.fatigue_level
-            self.tens_params["pulse_width"] = 250.0
-            self.tens_params["pattern"] = "burst"
-            
-        elif self.current_phase == ExercisePhase.COOLDOWN:
-            # Medium-low frequency for controlled cooldown
-            self.tens_params["frequency"] = 20.0
-            self.tens_params["pulse_width"] = 200.0
-            self.tens_params["pattern"] = "wave"
-            
-        elif self.current_phase == ExercisePhase.RECOVERY:
-            # Low frequency for recovery enhancement
-            self.tens_params["frequency"] = 5.0
-            self.tens_params["pulse_width"] = 300.0
-            self.tens_params["pattern"] = "long_pulse"
+        # Frequency and pulse width shift linearly with fatigue within each phase
+        frequency, frequency_slope = TENS_PHASE_FREQUENCY[self.current_phase]
+        pulse_width, pulse_width_slope = TENS_PHASE_PULSE_WIDTH[self.current_phase]
+        self.tens_params["frequency"] = frequency + frequency_slope * self.fatigue_level
+        self.tens_params["pulse_width"] = pulse_width + pulse_width_slope * self.fatigue_level
+        self.tens_params["pattern"] = TENS_PHASE_PATTERN[self.current_phase]
         
         # Adjust intensity based on fatigue level and user's max tolerance
         max_intensity = self.user_profile["max_tens_intensity"]
-        phase_intensity = {
-            ExercisePhase.WARMUP: 0.3,
-            ExercisePhase.MAIN: 0.6,
-            ExercisePhase.PEAK: 0.8,
-            ExercisePhase.COOLDOWN: 0.4,
-            ExercisePhase.RECOVERY: 0.3
-        }
         
         # Reduce intensity when fatigue is high
         fatigue_factor = 1.0 - (0.3 * self.fatigue_level)
         
         # Calculate final intensity with safety cap
-        base_intensity = phase_intensity[self.current_phase]
+        base_intensity = TENS_PHASE_INTENSITY[self.current_phase]
         self.tens_params["intensity"] = min(max_intensity, base_intensity * fatigue_factor)
     
     def _adjust_visual_parameters(self):
         """Adjust visual feedback based on exercise phase"""
-        # Color selection based on exercise phase
-        phase_colors = {
-            ExercisePhase.WARMUP: (0, 200, 255),    # Blue
-            ExercisePhase.MAIN: (0, 255, 0),        # Green
-            ExercisePhase.PEAK: (255, 0, 0),        # Red
-            ExercisePhase.COOLDOWN: (180, 180, 255), # Light blue
-            ExercisePhase.RECOVERY: (150, 255, 220)  # Mint green
-        }
-        
-        # Brightness and pattern based on intensity
-        phase_brightness = {
-            ExercisePhase.WARMUP: 0.5,
-            ExercisePhase.MAIN: 0.7,
-            ExercisePhase.PEAK: 0.9,
-            ExercisePhase.COOLDOWN: 0.6,
-            ExercisePhase.RECOVERY: 0.4
-        }
-        
-        phase_pattern = {
-            ExercisePhase.WARMUP: "slow_pulse",
-            ExercisePhase.MAIN: "steady",
-            ExercisePhase.PEAK: "fast_pulse",
-            ExercisePhase.COOLDOWN: "wave",
-            ExercisePhase.RECOVERY: "gentle_fade"
-        }
-        
-        self.visual_params["color"] = phase_colors[self.current_phase]
-        self.visual_params["brightness"] = phase_brightness[self.current_phase]
-        self.visual_params["pattern"] = phase_pattern[self.current_phase]
+        self.visual_params["color"] = VISUAL_PHASE_COLORS[self.current_phase]
+        self.visual_params["brightness"] = VISUAL_PHASE_BRIGHTNESS[self.current_phase]
+        self.visual_params["pattern"] = VISUAL_PHASE_PATTERN[self.current_phase]
     
     def _adjust_audio_parameters(self):
         """Adjust audio feedback based on exercise phase"""
-        # Binaural beat frequency based on desired brain state for each phase
-        phase_frequency = {
-            ExercisePhase.WARMUP: 10.0,     # Alpha waves for focus
-            ExercisePhase.MAIN: 16.0,       # Beta waves for alertness
-            ExercisePhase.PEAK: 20.0,       # High beta for intensity
-            ExercisePhase.COOLDOWN: 8.0,    # Alpha/theta border for relaxation
-            ExercisePhase.RECOVERY: 6.0     # Theta waves for recovery
-        }
-        
-        phase_volume = {
-            ExercisePhase.WARMUP: 0.5,
-            ExercisePhase.MAIN: 0.6,
-            ExercisePhase.PEAK: 0.7,
-            ExercisePhase.COOLDOWN: 0.5,
-            ExercisePhase.RECOVERY: 0.4
-        }
-        
-        # Audio pattern selection
+        # Phases without a fixed audio pattern use the user's preferred audio
         preferred_audio = self.user_profile.get("preferred_audio", "nature")
         
-        phase_pattern = {
-            ExercisePhase.WARMUP: preferred_audio,
-            ExercisePhase.MAIN: "rhythm",
-            ExercisePhase.PEAK: "motivational",
-            ExercisePhase.COOLDOWN: preferred_audio,
-            ExercisePhase.RECOVERY: "ambient"
-        }
-        
-        self.audio_params["frequency"] = phase_frequency[self.current_phase]
-        self.audio_params["volume"] = phase_volume[self.current_phase]
-        self.audio_params["pattern"] = phase_pattern[self.current_phase]
+        self.audio_params["frequency"] = AUDIO_PHASE_FREQUENCY[self.current_phase]
+        self.audio_params["volume"] = AUDIO_PHASE_VOLUME[self.current_phase]
+        self.audio_params["pattern"] = AUDIO_PHASE_PATTERN.get(self.current_phase, preferred_audio)
     
     def _adjust_haptic_parameters(self):
         """Adjust haptic (vibration) feedback based on exercise phase"""
-        phase_intensity = {
-            ExercisePhase.WARMUP: 0.4,
-            ExercisePhase.MAIN: 0.6,
-            ExercisePhase.PEAK: 0.8,
-            ExercisePhase.COOLDOWN: 0.5,
-            ExercisePhase.RECOVERY: 0.3
-        }
-        
-        phase_frequency = {
-            ExercisePhase.WARMUP: 40.0,
-            ExercisePhase.MAIN: 60.0,
-            ExercisePhase.PEAK: 80.0,
-            ExercisePhase.COOLDOWN: 50.0,
-            ExercisePhase.RECOVERY: 30.0
-        }
-        
-        phase_pattern = {
-            ExercisePhase.WARMUP: "rhythmic",
-            ExercisePhase.MAIN: "continuous",
-            ExercisePhase.PEAK: "pulsed",
-            ExercisePhase.COOLDOWN: "wave",
-            ExercisePhase.RECOVERY: "gentle"
-        }
-        
-        self.haptic_params["intensity"] = phase_intensity[self.current_phase]
-        self.haptic_params["frequency"] = phase_frequency[self.current_phase]
-        self.haptic_params["pattern"] = phase_pattern[self.current_phase]
+        self.haptic_params["intensity"] = HAPTIC_PHASE_INTENSITY[self.current_phase]
+        self.haptic_params["frequency"] = HAPTIC_PHASE_FREQUENCY[self.current_phase]
+        self.haptic_params["pattern"] = HAPTIC_PHASE_PATTERN[self.current_phase]
     
     def _adjust_thermal_parameters(self):
         """Adjust thermal feedback based on exercise phase"""
@@ -360,16 +520,8 @@ class StimulationController:
         sensitivity = self.user_profile.get("skin_sensitivity", "normal")
         sensitivity_factor = 1.0 if sensitivity == "normal" else 0.8
         
-        phase_temperature = {
-            ExercisePhase.WARMUP: 35.0,     # Warm
-            ExercisePhase.MAIN: 32.0,       # Neutral
-            ExercisePhase.PEAK: 30.0,       # Slight cooling
-            ExercisePhase.COOLDOWN: 28.0,   # Cooling
-            ExercisePhase.RECOVERY: 33.0    # Mild warming
-        }
-        
         # Adjust temperature based on fatigue (more cooling when fatigued)
-        base_temp = phase_temperature[self.current_phase]
+        base_temp = THERMAL_PHASE_TEMPERATURE[self.current_phase]
         fatigue_adjustment = self.fatigue_level * -2.0  # Up to 2 degrees cooler
         
         self.thermal_params["temperature"] = base_temp + fatigue_adjustment
@@ -8,13 +8,15 @@ Copyright (c) 2024 Ucaretron Inc.
 """
 
 import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib.gridspec import GridSpec
+import numexpr as ne
+from numba import njit, vectorize
+import math
 import os
 import sys
 from enum import Enum
 import time
-import json
+import orjson
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 # Add parent directory to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -22,12 +24,78 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 # Import the controller
 from exercise_enhancement.stimulation_controller import StimulationController, ExercisePhase
 
+# Phase names indexed by ExercisePhase value
+PHASE_NAMES = np.array([phase.name for phase in ExercisePhase])
+
+# Upper bound on points drawn per physiological trace
+MAX_PLOT_POINTS = 2000
+
+# Default seed so repeated runs (and benchmarks) see identical sensor noise
+DEFAULT_SEED = 42
+
+# Not cached on disk, for the same reason as _impedance below
+@njit(fastmath=True)
+def _lagged_gsr(hr_normalized, lag, smoothing, gain, initial_gain, out):
+    """
+    Compute GSR as a lagged, exponentially smoothed response to heart rate
+    
+    Args:
+        hr_normalized: Heart rate normalized to the heart rate reserve
+        lag: Number of samples GSR lags behind heart rate
+        smoothing: Weight of the previous GSR sample
+        gain: Weight of the lagged heart rate sample
+        initial_gain: Scale applied to heart rate before the lag has elapsed
+        out: Output array, filled in place
+    """
+    for i in range(hr_normalized.shape[0]):
+        if i > lag:
+            out[i] = smoothing * out[i - 1] + gain * hr_normalized[i - lag]
+        else:
+            out[i] = initial_gain * hr_normalized[i]
+    return out
+
+# Not cached on disk: this module is imported both as test_stimulation_controller
+# (by pytest) and as part of the package, and a cached ufunc only loads under one name
+@vectorize(["float64(float64, float64, float64, float64, float64, float64, float64, float64)"])
+def _impedance(normalized_time, noise, start, minimum, linear_weight, linear_rate, decay_rate,
+               noise_scale):
+    """
+    Impedance at one sample: a clamped linear drop plus an exponential drop, with noise
+    
+    Compiled as a NumPy ufunc, so every argument broadcasts and the result can
+    be written straight into an output array with out=.
+    
+    Args:
+        normalized_time: Elapsed fraction of the session
+        noise: Standard normal noise sample
+        start: Impedance at the start of the session
+        minimum: Impedance reached once fully dehydrated
+        linear_weight: Share of the drop that is linear; the rest is exponential
+        linear_rate: Rate of the linear drop, which stops at 1
+        decay_rate: Rate constant of the exponential drop
+        noise_scale: Standard deviation of the fluctuations
+    """
+    linear = min(normalized_time * linear_rate, 1.0)
+    exponential = 1.0 - math.exp(-normalized_time * decay_rate)
+    drop = (start - minimum) * (linear_weight * linear + (1.0 - linear_weight) * exponential)
+    return start - drop + noise_scale * noise
+
 class ExerciseSimulator:
     """
     Simulates exercise scenarios to test the Smart Orb controller
     """
     
-    def __init__(self, user_profile=None, duration_minutes=30, output_dir='output'):
+    __slots__ = (
+        "controller", "duration", "time_points", "_normalized_time", "output_dir",
+        "_max_hr", "_rest_hr", "_rng",
+        "heart_rate", "emg_activity", "acceleration", "gsr", "impedance",
+        "phase_history", "_phase_write_idx", "fatigue_history", "intensity_history",
+        "tens_frequency", "tens_intensity", "tens_pulse_width",
+        "visual_brightness", "audio_volume", "haptic_intensity", "thermal_temp"
+    )
+    
+    def __init__(self, user_profile=None, duration_minutes=30, output_dir='output',
+                 seed=DEFAULT_SEED):
         """
         Initialize the simulator with user profile and exercise parameters
         
@@ -35,12 +103,22 @@ class ExerciseSimulator:
             user_profile: Dictionary containing user information
             duration_minutes: Length of simulated exercise session in minutes
             output_dir: Directory to save output visualizations
+            seed: Seed for the simulator's random number generator. Fixed by
+                  default for reproducible runs; pass None for fresh entropy
         """
         self.controller = StimulationController(user_profile)
         self.duration = duration_minutes
         self.time_points = np.linspace(0, duration_minutes, duration_minutes * 60)  # 1 Hz sampling
+        self._normalized_time = self.time_points / duration_minutes
         self.output_dir = output_dir
         
+        # Random number generator used for all simulated sensor noise
+        self._rng = np.random.default_rng(seed)
+        
+        # Cache heart rate constants used throughout the generators
+        self._max_hr = self.controller.user_profile["max_heart_rate"]
+        self._rest_hr = self.controller.user_profile["resting_heart_rate"]
+        
         # Ensure output directory exists
         os.makedirs(output_dir, exist_ok=True)
         
@@ -51,7 +129,9 @@ class ExerciseSimulator:
         self.gsr = np.zeros_like(self.time_points)
         self.impedance = np.zeros_like(self.time_points)
         
-        self.phase_history = []
+        # Phase values for every 10th point (plus the final point) processed by the controller
+        self.phase_history = np.zeros(len(self.time_points) // 10 + 1, dtype=np.int8)
+        self._phase_write_idx = 0
         self.fatigue_history = np.zeros_like(self.time_points)
         self.intensity_history = np.zeros_like(self.time_points)
         
@@ -67,6 +147,33 @@ class ExerciseSimulator:
         self.thermal_temp = np.zeros_like(self.time_points)
         
         print(f"Initialized exercise simulator for {duration_minutes} minute session")
+    
+    def _sample_indices(self):
+        """
+        Indices of the time points processed by the controller
+        
+        Returns:
+            numpy.ndarray: Every 10th index plus the final one
+        """
+        num_points = len(self.time_points)
+        sample_indices = np.arange(0, num_points, 10)
+        if sample_indices[-1] != num_points - 1:
+            sample_indices = np.append(sample_indices, num_points - 1)
+        return sample_indices
+    
+    def _phase_masks(self, phase_ends):
+        """
+        Split the session timeline into workout phases
+        
+        Args:
+            phase_ends: Increasing normalized end times of every phase but the last
+            
+        Returns:
+            list: One boolean mask per phase, in order
+        """
+        # Phase index for every time point, found with one binary search pass
+        phase_index = np.searchsorted(phase_ends, self._normalized_time, side='left')
+        return [phase_index == k for k in range(len(phase_ends) + 1)]
 
     def generate_standard_workout(self):
         """
@@ -80,109 +187,77 @@ class ExerciseSimulator:
         peak_end = 0.85    # Next 10% is peak intensity
         # Remaining 15% is cooldown
 
-        max_hr = self.controller.user_profile["max_heart_rate"]
-        rest_hr = self.controller.user_profile["resting_heart_rate"]
+        max_hr = self._max_hr
+        rest_hr = self._rest_hr
+        
+        # Draw all random noise for the session in one go
+        emg_noise, impedance_noise = self._rng.standard_normal((2, len(self.time_points)))
+        movement_jitter = self._rng.random(len(self.time_points))
         
         # Generate heart rate profile
-        for i, t in enumerate(self.time_points):
-            normalized_time = t / self.duration
-            
-            if normalized_time <= warmup_end:
-                # Warmup: Heart rate increases linearly
-                hr_pct = normalized_time / warmup_end * 0.5  # Up to 50% of reserve
-                self.heart_rate[i] = rest_hr + hr_pct * (max_hr - rest_hr)
-                
-            elif normalized_time <= main_end:
-                # Main exercise: Heart rate varies with some intervals
-                main_phase_time = (normalized_time - warmup_end) / (main_end - warmup_end)
-                
-                # Add some intervals for realism
-                interval_effect = 0.1 * np.sin(main_phase_time * 2 * np.pi * 4)
-                
-                hr_pct = 0.5 + main_phase_time * 0.3 + interval_effect  # 50-80% with intervals
-                self.heart_rate[i] = rest_hr + hr_pct * (max_hr - rest_hr)
-                
-            elif normalized_time <= peak_end:
-                # Peak effort: High heart rate
-                peak_phase_time = (normalized_time - main_end) / (peak_end - main_end)
-                hr_pct = 0.8 + peak_phase_time * 0.15  # 80-95%
-                self.heart_rate[i] = rest_hr + hr_pct * (max_hr - rest_hr)
-                
-            else:
-                # Cooldown: Heart rate decreases exponentially
-                cooldown_phase_time = (normalized_time - peak_end) / (1.0 - peak_end)
-                hr_pct = 0.95 * np.exp(-3 * cooldown_phase_time)  # Exponential decrease
-                self.heart_rate[i] = rest_hr + hr_pct * (max_hr - rest_hr)
+        normalized_time = self._normalized_time
+        warmup, main, peak, cooldown = self._phase_masks((warmup_end, main_end, peak_end))
+        hr_pct = np.empty_like(normalized_time)
+        
+        # Warmup: Heart rate increases linearly
+        hr_pct[warmup] = normalized_time[warmup] / warmup_end * 0.5  # Up to 50% of reserve
+        
+        # Main exercise: Heart rate varies with some intervals (50-80%)
+        main_phase_time = (normalized_time[main] - warmup_end) / (main_end - warmup_end)
+        interval_effect = 0.1 * np.sin(main_phase_time * 2 * np.pi * 4)
+        hr_pct[main] = 0.5 + main_phase_time * 0.3 + interval_effect
+        
+        # Peak effort: High heart rate (80-95%)
+        peak_phase_time = (normalized_time[peak] - main_end) / (peak_end - main_end)
+        hr_pct[peak] = 0.8 + peak_phase_time * 0.15
+        
+        # Cooldown: Heart rate decreases exponentially
+        cooldown_phase_time = (normalized_time[cooldown] - peak_end) / (1.0 - peak_end)
+        hr_pct[cooldown] = 0.95 * np.exp(-3 * cooldown_phase_time)
+        
+        self.heart_rate[:] = rest_hr + hr_pct * (max_hr - rest_hr)
         
         # Generate EMG activity (roughly correlates with heart rate but with more variation)
-        for i, t in enumerate(self.time_points):
-            normalized_time = t / self.duration
-            
-            # Base EMG follows heart rate with normalized scale
-            hr_normalized = (self.heart_rate[i] - rest_hr) / (max_hr - rest_hr)
-            
-            # Add more randomness to EMG
-            noise = 0.15 * np.random.randn()
-            
-            # Add fatigue effect - EMG amplitude decreases as workout progresses
-            fatigue_effect = 0.2 * normalized_time if normalized_time <= peak_end else 0.2
-            
-            self.emg_activity[i] = min(1.0, max(0.0, hr_normalized + noise - fatigue_effect))
+        # Base EMG follows heart rate with normalized scale
+        hr_normalized = (self.heart_rate - rest_hr) / (max_hr - rest_hr)
+        
+        # Add more randomness to EMG
+        noise = 0.15 * emg_noise
+        
+        # Add fatigue effect - EMG amplitude decreases as workout progresses
+        fatigue_effect = np.where(cooldown, 0.2, 0.2 * normalized_time)
+        
+        np.clip(hr_normalized + noise - fatigue_effect, 0.0, 1.0, out=self.emg_activity)
         
         # Generate acceleration data (movement intensity)
-        for i, t in enumerate(self.time_points):
-            normalized_time = t / self.duration
-            
-            if normalized_time <= warmup_end:
-                # Warmup: Gradually increasing movement
-                self.acceleration[i] = 0.5 * (normalized_time / warmup_end)
-                
-            elif normalized_time <= main_end:
-                # Main exercise: Moderate with intervals
-                main_phase_time = (normalized_time - warmup_end) / (main_end - warmup_end)
-                interval_effect = 0.3 * np.sin(main_phase_time * 2 * np.pi * 5)
-                self.acceleration[i] = 0.5 + 0.3 * main_phase_time + interval_effect
-                
-            elif normalized_time <= peak_end:
-                # Peak: High intensity movement
-                self.acceleration[i] = 0.8 + 0.2 * np.random.rand()
-                
-            else:
-                # Cooldown: Decreasing movement
-                cooldown_phase_time = (normalized_time - peak_end) / (1.0 - peak_end)
-                self.acceleration[i] = 0.8 * (1 - cooldown_phase_time)
+        # Warmup: Gradually increasing movement
+        self.acceleration[warmup] = 0.5 * (normalized_time[warmup] / warmup_end)
+        
+        # Main exercise: Moderate with intervals
+        self.acceleration[main] = (0.5 + 0.3 * main_phase_time
+                                   + 0.3 * np.sin(main_phase_time * 2 * np.pi * 5))
+        
+        # Peak: High intensity movement
+        self.acceleration[peak] = 0.8 + 0.2 * movement_jitter[peak]
+        
+        # Cooldown: Decreasing movement
+        self.acceleration[cooldown] = 0.8 * (1 - cooldown_phase_time)
         
         # Generate GSR data (stress response)
-        for i, t in enumerate(self.time_points):
-            normalized_time = t / self.duration
-            
-            # GSR follows heart rate with lag and smoothing
-            if i > 60:  # 1-minute lag
-                hr_normalized = (self.heart_rate[i-60] - rest_hr) / (max_hr - rest_hr)
-                self.gsr[i] = 0.8 * self.gsr[i-1] + 0.2 * hr_normalized
-            else:
-                hr_normalized = (self.heart_rate[i] - rest_hr) / (max_hr - rest_hr)
-                self.gsr[i] = 0.3 * hr_normalized
+        # GSR follows heart rate with lag and smoothing (1-minute lag)
+        _lagged_gsr(hr_normalized, 60, 0.8, 0.2, 0.3, self.gsr)
         
         # Generate impedance data (approximation of hydration changes)
         # Higher values = better hydration, decreases during exercise
         start_impedance = 500  # Starting value
         min_impedance = 450    # Minimum value
         
-        for i, t in enumerate(self.time_points):
-            normalized_time = t / self.duration
-            
-            # Impedance decreases as workout progresses (dehydration)
-            impedance_drop = (start_impedance - min_impedance) * (
-                0.7 * min(1.0, normalized_time * 2) +  # Main decrease
-                0.3 * (1 - np.exp(-normalized_time * 3))  # Exponential component
-            )
-            
-            # Add small random fluctuations
-            noise = 3 * np.random.randn()
-            
-            self.impedance[i] = start_impedance - impedance_drop + noise
-            
+        # Impedance decreases as workout progresses (dehydration)
+        # Main decrease plus an exponential component,
+        # with small random fluctuations on top
+        _impedance(normalized_time, impedance_noise, start_impedance, min_impedance,
+                   0.7, 2.0, 3.0, 3, out=self.impedance)
+        
         print("Standard workout pattern generated")
         return self
 
@@ -197,8 +272,12 @@ class ExerciseSimulator:
         main_end = 0.9     # Next 80% is intervals
         # Remaining 10% is cooldown
 
-        max_hr = self.controller.user_profile["max_heart_rate"]
-        rest_hr = self.controller.user_profile["resting_heart_rate"]
+        max_hr = self._max_hr
+        rest_hr = self._rest_hr
+        
+        # Draw all random noise for the session in one go
+        emg_noise, impedance_noise = self._rng.standard_normal((2, len(self.time_points)))
+        movement_jitter = self._rng.random(len(self.time_points))
         
         # HIIT parameters
         interval_count = 8
@@ -206,101 +285,61 @@ class ExerciseSimulator:
         rest_duration = 1.0  # minutes
         
         # Generate heart rate profile
-        for i, t in enumerate(self.time_points):
-            normalized_time = t / self.duration
-            
-            if normalized_time <= warmup_end:
-                # Warmup: Heart rate increases linearly
-                hr_pct = normalized_time / warmup_end * 0.5  # Up to 50% of reserve
-                self.heart_rate[i] = rest_hr + hr_pct * (max_hr - rest_hr)
-                
-            elif normalized_time <= main_end:
-                # HIIT intervals
-                main_phase_time = t - (warmup_end * self.duration)
-                cycle_duration = work_duration + rest_duration
-                cycle_position = main_phase_time % cycle_duration
-                
-                if cycle_position < work_duration:
-                    # High intensity interval
-                    interval_position = cycle_position / work_duration
-                    hr_pct = 0.7 + 0.25 * (1 - np.exp(-3 * interval_position))  # Quick rise to 95%
-                else:
-                    # Recovery between intervals
-                    recovery_position = (cycle_position - work_duration) / rest_duration
-                    hr_pct = 0.7 * np.exp(-2 * recovery_position) + 0.4  # Exponential decrease to 40%
-                
-                self.heart_rate[i] = rest_hr + hr_pct * (max_hr - rest_hr)
-                
-            else:
-                # Cooldown: Heart rate decreases exponentially
-                cooldown_phase_time = (normalized_time - main_end) / (1.0 - main_end)
-                hr_pct = 0.7 * np.exp(-3 * cooldown_phase_time)  # Exponential decrease
-                self.heart_rate[i] = rest_hr + hr_pct * (max_hr - rest_hr)
+        normalized_time = self._normalized_time
+        warmup, main, cooldown = self._phase_masks((warmup_end, main_end))
+        hr_pct = np.empty_like(normalized_time)
+        
+        # Warmup: Heart rate increases linearly
+        hr_pct[warmup] = normalized_time[warmup] / warmup_end * 0.5  # Up to 50% of reserve
+        
+        # HIIT intervals: quick rise to 95% during work, exponential decrease to 40% in recovery
+        main_phase_time = self.time_points[main] - (warmup_end * self.duration)
+        cycle_position = np.mod(main_phase_time, work_duration + rest_duration)
+        hr_pct[main] = ne.evaluate(
+            "where(cp < W, 0.7 + 0.25 * (1 - exp(-3 * cp / W)),"
+            " 0.7 * exp(-2 * (cp - W) / R) + 0.4)",
+            local_dict={"cp": cycle_position, "W": work_duration, "R": rest_duration}
+        )
+        
+        # Cooldown: Heart rate decreases exponentially
+        cooldown_phase_time = (normalized_time[cooldown] - main_end) / (1.0 - main_end)
+        hr_pct[cooldown] = 0.7 * np.exp(-3 * cooldown_phase_time)
+        
+        self.heart_rate[:] = rest_hr + hr_pct * (max_hr - rest_hr)
         
         # Generate EMG activity with higher peaks during intervals
-        for i, t in enumerate(self.time_points):
-            normalized_time = t / self.duration
-            
-            # Base EMG follows heart rate with normalized scale
-            hr_normalized = (self.heart_rate[i] - rest_hr) / (max_hr - rest_hr)
-            
-            # Add more randomness to EMG
-            noise = 0.1 * np.random.randn()
-            
-            # Add fatigue effect - EMG amplitude decreases as workout progresses
-            # Stronger fatigue effect in HIIT
-            fatigue_effect = 0.3 * normalized_time if normalized_time <= main_end else 0.3
-            
-            # HIIT has higher muscle activation during intervals
-            intensity_boost = 0.0
-            if warmup_end < normalized_time <= main_end:
-                main_phase_time = t - (warmup_end * self.duration)
-                cycle_duration = work_duration + rest_duration
-                cycle_position = main_phase_time % cycle_duration
-                
-                if cycle_position < work_duration:
-                    # Boost during high intensity intervals
-                    intensity_boost = 0.2
-            
-            self.emg_activity[i] = min(1.0, max(0.0, hr_normalized + noise - fatigue_effect + intensity_boost))
+        # Base EMG follows heart rate with normalized scale
+        hr_normalized = (self.heart_rate - rest_hr) / (max_hr - rest_hr)
+        
+        # Add more randomness to EMG
+        noise = 0.1 * emg_noise
+        
+        # Add fatigue effect - EMG amplitude decreases as workout progresses
+        # Stronger fatigue effect in HIIT
+        fatigue_effect = np.where(cooldown, 0.3, 0.3 * normalized_time)
+        
+        # HIIT has higher muscle activation during high intensity intervals
+        intensity_boost = np.zeros_like(normalized_time)
+        intensity_boost[main] = np.where(cycle_position < work_duration, 0.2, 0.0)
+        
+        np.clip(hr_normalized + noise - fatigue_effect + intensity_boost, 0.0, 1.0,
+                out=self.emg_activity)
         
         # Generate acceleration data with high burst during intervals
-        for i, t in enumerate(self.time_points):
-            normalized_time = t / self.duration
-            
-            if normalized_time <= warmup_end:
-                # Warmup: Gradually increasing movement
-                self.acceleration[i] = 0.5 * (normalized_time / warmup_end)
-                
-            elif normalized_time <= main_end:
-                # HIIT intervals
-                main_phase_time = t - (warmup_end * self.duration)
-                cycle_duration = work_duration + rest_duration
-                cycle_position = main_phase_time % cycle_duration
-                
-                if cycle_position < work_duration:
-                    # High intensity interval
-                    self.acceleration[i] = 1.5 + 0.3 * np.random.rand()
-                else:
-                    # Recovery
-                    self.acceleration[i] = 0.3 + 0.2 * np.random.rand()
-                
-            else:
-                # Cooldown: Decreasing movement
-                cooldown_phase_time = (normalized_time - main_end) / (1.0 - main_end)
-                self.acceleration[i] = 0.5 * (1 - cooldown_phase_time)
+        # Warmup: Gradually increasing movement
+        self.acceleration[warmup] = 0.5 * (normalized_time[warmup] / warmup_end)
+        
+        # HIIT intervals: high intensity bursts, low movement during recovery
+        burst = movement_jitter[main]
+        self.acceleration[main] = np.where(cycle_position < work_duration,
+                                           1.5 + 0.3 * burst, 0.3 + 0.2 * burst)
+        
+        # Cooldown: Decreasing movement
+        self.acceleration[cooldown] = 0.5 * (1 - cooldown_phase_time)
         
         # Generate GSR data (stress response)
-        for i, t in enumerate(self.time_points):
-            normalized_time = t / self.duration
-            
-            # GSR follows heart rate with lag and smoothing
-            if i > 30:  # 30-second lag (shorter for HIIT)
-                hr_normalized = (self.heart_rate[i-30] - rest_hr) / (max_hr - rest_hr)
-                self.gsr[i] = 0.7 * self.gsr[i-1] + 0.3 * hr_normalized
-            else:
-                hr_normalized = (self.heart_rate[i] - rest_hr) / (max_hr - rest_hr)
-                self.gsr[i] = 0.3 * hr_normalized
+        # GSR follows heart rate with lag and smoothing (30-second lag, shorter for HIIT)
+        _lagged_gsr(hr_normalized, 30, 0.7, 0.3, 0.3, self.gsr)
         
         # Generate impedance data (approximation of hydration changes)
         # Higher values = better hydration, decreases during exercise
@@ -308,20 +347,12 @@ class ExerciseSimulator:
         start_impedance = 500  # Starting value
         min_impedance = 430    # Lower minimum value for HIIT
         
-        for i, t in enumerate(self.time_points):
-            normalized_time = t / self.duration
-            
-            # Impedance decreases as workout progresses (dehydration)
-            impedance_drop = (start_impedance - min_impedance) * (
-                0.8 * min(1.0, normalized_time * 2.5) +  # Faster decrease
-                0.2 * (1 - np.exp(-normalized_time * 4))  # Exponential component
-            )
-            
-            # Add small random fluctuations
-            noise = 3 * np.random.randn()
-            
-            self.impedance[i] = start_impedance - impedance_drop + noise
-            
+        # Impedance decreases as workout progresses (dehydration)
+        # Faster decrease plus an exponential component,
+        # with small random fluctuations on top
+        _impedance(normalized_time, impedance_noise, start_impedance, min_impedance,
+                   0.8, 2.5, 4.0, 3, out=self.impedance)
+        
         print("HIIT workout pattern generated")
         return self
     
@@ -336,84 +367,64 @@ class ExerciseSimulator:
         main_end = 0.85    # Next 75% is steady-state
         # Remaining 15% is cooldown
 
-        max_hr = self.controller.user_profile["max_heart_rate"]
-        rest_hr = self.controller.user_profile["resting_heart_rate"]
+        max_hr = self._max_hr
+        rest_hr = self._rest_hr
+        
+        # Draw all random noise for the session in one go
+        emg_noise, impedance_noise = self._rng.standard_normal((2, len(self.time_points)))
         
         # Target heart rate for endurance (60-70% of max)
         target_hr_pct = 0.65
         target_hr = rest_hr + target_hr_pct * (max_hr - rest_hr)
         
         # Generate heart rate profile
-        for i, t in enumerate(self.time_points):
-            normalized_time = t / self.duration
-            
-            if normalized_time <= warmup_end:
-                # Warmup: Heart rate increases linearly
-                hr_pct = normalized_time / warmup_end * target_hr_pct  # Up to target
-                self.heart_rate[i] = rest_hr + hr_pct * (max_hr - rest_hr)
-                
-            elif normalized_time <= main_end:
-                # Steady state with small variations
-                main_phase_time = (normalized_time - warmup_end) / (main_end - warmup_end)
-                
-                # Add gentle undulations for realism
-                undulation = 0.05 * np.sin(main_phase_time * 2 * np.pi * 3)
-                
-                # Add slight drift upward due to cardiac drift
-                drift = 0.05 * main_phase_time
-                
-                hr_pct = target_hr_pct + undulation + drift
-                self.heart_rate[i] = rest_hr + hr_pct * (max_hr - rest_hr)
-                
-            else:
-                # Cooldown: Heart rate decreases exponentially
-                cooldown_phase_time = (normalized_time - main_end) / (1.0 - main_end)
-                hr_pct = (target_hr_pct + 0.05) * np.exp(-2 * cooldown_phase_time)  # Exponential decrease
-                self.heart_rate[i] = rest_hr + hr_pct * (max_hr - rest_hr)
+        normalized_time = self._normalized_time
+        warmup, main, cooldown = self._phase_masks((warmup_end, main_end))
+        hr_pct = np.empty_like(normalized_time)
+        
+        # Warmup: Heart rate increases linearly
+        hr_pct[warmup] = normalized_time[warmup] / warmup_end * target_hr_pct  # Up to target
+        
+        # Steady state with gentle undulations and a slight upward cardiac drift
+        main_phase_time = (normalized_time[main] - warmup_end) / (main_end - warmup_end)
+        hr_pct[main] = ne.evaluate(
+            "target + 0.05 * sin(mt * 2 * pi * 3) + 0.05 * mt",
+            local_dict={"target": target_hr_pct, "mt": main_phase_time, "pi": np.pi}
+        )
+        
+        # Cooldown: Heart rate decreases exponentially
+        cooldown_phase_time = (normalized_time[cooldown] - main_end) / (1.0 - main_end)
+        hr_pct[cooldown] = (target_hr_pct + 0.05) * np.exp(-2 * cooldown_phase_time)
+        
+        self.heart_rate[:] = rest_hr + hr_pct * (max_hr - rest_hr)
         
         # Generate EMG activity (moderate and steady)
-        for i, t in enumerate(self.time_points):
-            normalized_time = t / self.duration
-            
-            # Base EMG follows heart rate with normalized scale
-            hr_normalized = (self.heart_rate[i] - rest_hr) / (max_hr - rest_hr)
-            
-            # Add small randomness to EMG
-            noise = 0.05 * np.random.randn()
-            
-            # Add fatigue effect - EMG amplitude decreases more in endurance
-            fatigue_effect = 0.4 * normalized_time if normalized_time <= main_end else 0.4
-            
-            self.emg_activity[i] = min(1.0, max(0.0, hr_normalized + noise - fatigue_effect))
+        # Base EMG follows heart rate with normalized scale
+        hr_normalized = (self.heart_rate - rest_hr) / (max_hr - rest_hr)
+        
+        # Add small randomness to EMG
+        noise = 0.05 * emg_noise
+        
+        # Add fatigue effect - EMG amplitude decreases more in endurance
+        fatigue_effect = np.where(cooldown, 0.4, 0.4 * normalized_time)
+        
+        np.clip(hr_normalized + noise - fatigue_effect, 0.0, 1.0, out=self.emg_activity)
         
         # Generate acceleration data (steady and rhythmic)
-        for i, t in enumerate(self.time_points):
-            normalized_time = t / self.duration
-            
-            if normalized_time <= warmup_end:
-                # Warmup: Gradually increasing movement
-                self.acceleration[i] = 0.3 * (normalized_time / warmup_end) + 0.1 * np.sin(t * 10)
-                
-            elif normalized_time <= main_end:
-                # Steady-state rhythmic movement
-                self.acceleration[i] = 0.4 + 0.1 * np.sin(t * 10)  # Rhythmic component
-                
-            else:
-                # Cooldown: Decreasing movement
-                cooldown_phase_time = (normalized_time - main_end) / (1.0 - main_end)
-                self.acceleration[i] = (0.4 + 0.1 * np.sin(t * 10)) * (1 - cooldown_phase_time)
+        rhythm = 0.1 * np.sin(self.time_points * 10)  # Rhythmic component
+        
+        # Warmup: Gradually increasing movement
+        self.acceleration[warmup] = 0.3 * (normalized_time[warmup] / warmup_end) + rhythm[warmup]
+        
+        # Steady-state rhythmic movement
+        self.acceleration[main] = 0.4 + rhythm[main]
+        
+        # Cooldown: Decreasing movement
+        self.acceleration[cooldown] = (0.4 + rhythm[cooldown]) * (1 - cooldown_phase_time)
         
         # Generate GSR data (stress response) - lower for endurance
-        for i, t in enumerate(self.time_points):
-            normalized_time = t / self.duration
-            
-            # GSR follows heart rate with lag and smoothing
-            if i > 120:  # 2-minute lag (longer for endurance)
-                hr_normalized = (self.heart_rate[i-120] - rest_hr) / (max_hr - rest_hr)
-                self.gsr[i] = 0.9 * self.gsr[i-1] + 0.1 * hr_normalized
-            else:
-                hr_normalized = (self.heart_rate[i] - rest_hr) / (max_hr - rest_hr)
-                self.gsr[i] = 0.2 * hr_normalized
+        # GSR follows heart rate with lag and smoothing (2-minute lag, longer for endurance)
+        _lagged_gsr(hr_normalized, 120, 0.9, 0.1, 0.2, self.gsr)
         
         # Generate impedance data (approximation of hydration changes)
         # Higher values = better hydration, decreases during exercise
@@ -421,206 +432,120 @@ class ExerciseSimulator:
         start_impedance = 500  # Starting value
         min_impedance = 420    # Lower minimum value for endurance
         
-        for i, t in enumerate(self.time_points):
-            normalized_time = t / self.duration
-            
-            # Impedance decreases as workout progresses (dehydration)
-            impedance_drop = (start_impedance - min_impedance) * (
-                0.6 * min(1.0, normalized_time * 1.5) +  # Slower initial decrease
-                0.4 * (1 - np.exp(-normalized_time * 2))  # Exponential component
-            )
-            
-            # Add small random fluctuations
-            noise = 2 * np.random.randn()
-            
-            self.impedance[i] = start_impedance - impedance_drop + noise
-            
+        # Impedance decreases as workout progresses (dehydration)
+        # Slower initial decrease plus an exponential component,
+        # with small random fluctuations on top
+        _impedance(normalized_time, impedance_noise, start_impedance, min_impedance,
+                   0.6, 1.5, 2.0, 2, out=self.impedance)
+        
         print("Endurance workout pattern generated")
         return self
     
-    def run_simulation(self):
+    def run_simulation(self, verbose=False):
         """
         Run the simulation by processing all time points through the controller
+        
+        Args:
+            verbose: Print a progress line every 5 simulated minutes
         """
         print("Running simulation through stimulation controller...")
         
-        # Process each time point
-        for i, t in enumerate(self.time_points):
-            # Skip some points for speed (process every 10th point)
-            if i % 10 != 0 and i != len(self.time_points) - 1:
-                continue
-                
-            # Update controller with current physiological state
-            state = self.controller.update_physiological_state(
-                heart_rate=self.heart_rate[i],
-                emg_activity=self.emg_activity[i],
-                gsr=self.gsr[i],
-                acceleration=self.acceleration[i],
-                impedance_data=self.impedance[i]
-            )
-            
-            # Get stimulation parameters
-            params = self.controller.adjust_stimulation()
-            
-            # Record state and parameters
-            self.phase_history.append(state["phase"])
-            self.fatigue_history[i] = state["fatigue"]
-            self.intensity_history[i] = state["intensity"]
-            
-            # Record TENS parameters
-            self.tens_frequency[i] = params["tens"]["frequency"]
-            self.tens_intensity[i] = params["tens"]["intensity"]
-            self.tens_pulse_width[i] = params["tens"]["pulse_width"]
-            
-            # Record other stimulation parameters
-            self.visual_brightness[i] = params["visual"]["brightness"]
-            self.audio_volume[i] = params["audio"]["volume"]
-            self.haptic_intensity[i] = params["haptic"]["intensity"]
-            self.thermal_temp[i] = params["thermal"]["temperature"]
-            
-            # Print progress
-            if i % 300 == 0:  # Every 5 minutes
-                minutes = int(t)
-                print(f"Processed {minutes} minutes. Phase: {state['phase'].name}, Fatigue: {state['fatigue']:.2f}")
-        
-        print("Simulation complete")
+        # Process every 10th time point (plus the final one) for speed
+        sample_indices = self._sample_indices()
+        
+        # Run the sampled sensor columns through the controller in one batch
+        results = self.controller.process_sensor_batch({
+            "heart_rate": self.heart_rate[sample_indices],
+            "emg_activity": self.emg_activity[sample_indices],
+            "gsr": self.gsr[sample_indices],
+            "acceleration": self.acceleration[sample_indices],
+            "impedance_data": self.impedance[sample_indices]
+        })
+        
+        # Record state and parameters
+        processed_points = len(sample_indices)
+        self.phase_history[:processed_points] = results["phase"]
+        self._phase_write_idx = processed_points
+        self.fatigue_history[sample_indices] = results["fatigue"]
+        self.intensity_history[sample_indices] = results["intensity"]
+        
+        # Record TENS parameters
+        self.tens_frequency[sample_indices] = results["tens_frequency"]
+        self.tens_intensity[sample_indices] = results["tens_intensity"]
+        self.tens_pulse_width[sample_indices] = results["tens_pulse_width"]
+        
+        # Record other stimulation parameters
+        self.visual_brightness[sample_indices] = results["visual_brightness"]
+        self.audio_volume[sample_indices] = results["audio_volume"]
+        self.haptic_intensity[sample_indices] = results["haptic_intensity"]
+        self.thermal_temp[sample_indices] = results["thermal_temp"]
+        
+        # Print progress
+        if verbose:
+            for j in np.flatnonzero(sample_indices % 300 == 0).tolist():  # Every 5 minutes
+                minutes = int(self.time_points[sample_indices[j]])
+                print(f"Processed {minutes} minutes. Phase: {PHASE_NAMES[results['phase'][j]]}, "
+                      f"Fatigue: {results['fatigue'][j]:.2f}")
+        
+        print(f"Simulation complete ({processed_points} points processed). "
+              f"Final phase: {self.controller.current_phase.name}, "
+              f"Fatigue: {self.controller.fatigue_level:.2f}")
         return self
     
-    def visualize_results(self, title="Smart Orb Simulation Results"):
+    def visualize_results(self, title="Smart Orb Simulation Results", executor=None):
         """
         Generate visualizations of the simulation results
         
         Args:
             title: Title for the visualization
+            executor: Optional concurrent.futures executor used to render the
+                      figure in the background
             
         Returns:
-            str: Path to saved visualization file
+            str: Path to saved visualization file, or a Future resolving to it
+                 when an executor is given
         """
         print("Generating visualizations...")
         
-        # Create figure
-        plt.figure(figsize=(15, 12))
-        gs = GridSpec(5, 2, figure=plt.gcf())
-        
-        # Convert phase history to numeric for plotting
-        phase_numeric = np.zeros_like(self.time_points)
-        for i, phase in enumerate(self.phase_history):
-            idx = i * 10  # Because we processed every 10th point
-            if idx < len(phase_numeric):
-                phase_numeric[idx] = phase.value
-        
-        # Interpolate values at skipped points
-        from scipy.interpolate import interp1d
-        valid_indices = np.where(phase_numeric != 0)[0]
-        if len(valid_indices) > 1:  # Need at least 2 points for interpolation
-            f = interp1d(valid_indices, phase_numeric[valid_indices], kind='previous', 
-                         bounds_error=False, fill_value=phase_numeric[valid_indices[0]])
-            all_indices = np.arange(len(phase_numeric))
-            phase_numeric = f(all_indices)
-        
-        # Plot physiological signals
-        ax1 = plt.subplot(gs[0, 0])
-        ax1.plot(self.time_points, self.heart_rate, 'r-', label='Heart Rate (BPM)')
-        ax1.set_ylabel('Heart Rate (BPM)')
-        ax1.set_ylim(self.controller.user_profile["resting_heart_rate"] - 10, 
-                    self.controller.user_profile["max_heart_rate"] + 10)
-        ax1.set_title('Physiological Signals')
-        ax1.grid(True)
-        
-        ax2 = plt.subplot(gs[1, 0], sharex=ax1)
-        ax2.plot(self.time_points, self.emg_activity, 'g-', label='EMG Activity')
-        ax2.set_ylabel('EMG Activity')
-        ax2.set_ylim(0, 1.1)
-        ax2.grid(True)
-        
-        ax3 = plt.subplot(gs[2, 0], sharex=ax1)
-        ax3.plot(self.time_points, self.acceleration, 'b-', label='Acceleration')
-        ax3.set_ylabel('Acceleration')
-        ax3.set_ylim(0, 2.0)
-        ax3.grid(True)
-        
-        ax4 = plt.subplot(gs[3, 0], sharex=ax1)
-        ax4.plot(self.time_points, self.gsr, 'm-', label='GSR')
-        ax4.set_ylabel('GSR')
-        ax4.set_ylim(0, 1.1)
-        ax4.grid(True)
-        
-        ax5 = plt.subplot(gs[4, 0], sharex=ax1)
-        ax5.plot(self.time_points, self.impedance, 'k-', label='Impedance')
-        ax5.set_ylabel('Impedance')
-        ax5.set_xlabel('Time (minutes)')
-        ax5.set_ylim(400, 520)
-        ax5.grid(True)
-        
-        # Plot exercise phases and controller outputs
-        ax6 = plt.subplot(gs[0, 1])
-        ax6.plot(self.time_points, phase_numeric, 'c-', linewidth=2)
-        ax6.set_ylabel('Exercise Phase')
-        ax6.set_yticks(range(5))
-        ax6.set_yticklabels(['Warmup', 'Main', 'Peak', 'Cooldown', 'Recovery'])
-        ax6.set_title('Controller Response')
-        ax6.grid(True)
-        
-        ax7 = plt.subplot(gs[1, 1], sharex=ax6)
-        ax7.plot(self.time_points, self.fatigue_history, 'r-', label='Fatigue')
-        ax7.plot(self.time_points, self.intensity_history, 'b-', label='Intensity')
-        ax7.set_ylabel('Level')
-        ax7.set_ylim(0, 1.1)
-        ax7.legend()
-        ax7.grid(True)
-        
-        # Plot TENS parameters
-        ax8 = plt.subplot(gs[2, 1], sharex=ax6)
-        ax8.plot(self.time_points, self.tens_frequency, 'g-', label='Frequency')
-        ax8_twin = ax8.twinx()
-        ax8_twin.plot(self.time_points, self.tens_intensity * 100, 'r-', label='Intensity %')
-        ax8.set_ylabel('TENS Frequency (Hz)')
-        ax8_twin.set_ylabel('TENS Intensity (%)')
-        ax8.set_ylim(0, 60)
-        ax8_twin.set_ylim(0, 100)
-        ax8.grid(True)
-        
-        # Create custom legend
-        lines1, labels1 = ax8.get_legend_handles_labels()
-        lines2, labels2 = ax8_twin.get_legend_handles_labels()
-        ax8.legend(lines1 + lines2, labels1 + labels2, loc='upper right')
-        
-        # Plot other stimulation parameters
-        ax9 = plt.subplot(gs[3, 1], sharex=ax6)
-        ax9.plot(self.time_points, self.visual_brightness * 100, 'b-', label='Visual')
-        ax9.plot(self.time_points, self.audio_volume * 100, 'g-', label='Audio')
-        ax9.plot(self.time_points, self.haptic_intensity * 100, 'r-', label='Haptic')
-        ax9.set_ylabel('Intensity (%)')
-        ax9.set_ylim(0, 100)
-        ax9.legend()
-        ax9.grid(True)
-        
-        ax10 = plt.subplot(gs[4, 1], sharex=ax6)
-        ax10.plot(self.time_points, self.thermal_temp, 'c-')
-        ax10.set_ylabel('Temperature (°C)')
-        ax10.set_xlabel('Time (minutes)')
-        ax10.set_ylim(25, 37)
-        ax10.grid(True)
-        
-        # Set common x-axis properties
-        for ax in [ax1, ax2, ax3, ax4, ax5, ax6, ax7, ax8, ax9, ax10]:
-            ax.set_xlim(0, self.duration)
-        
-        plt.tight_layout()
-        plt.suptitle(title, fontsize=16, y=1.02)
-        
-        # Save the figure
+        # Collect plain arrays so the rendering step can be pickled to a worker.
+        # Controller outputs only exist at the processed points, so pass just those.
+        sample_indices = self._sample_indices()
+        arrays = {
+            "duration": self.duration,
+            "rest_hr": self._rest_hr,
+            "max_hr": self._max_hr,
+            "time_points": self.time_points,
+            "heart_rate": self.heart_rate,
+            "emg_activity": self.emg_activity,
+            "acceleration": self.acceleration,
+            "gsr": self.gsr,
+            "impedance": self.impedance,
+            "sample_times": self.time_points[sample_indices],
+            "phase": self.phase_history[:self._phase_write_idx],
+            "fatigue": self.fatigue_history[sample_indices],
+            "intensity": self.intensity_history[sample_indices],
+            "tens_frequency": self.tens_frequency[sample_indices],
+            "tens_intensity": self.tens_intensity[sample_indices],
+            "visual_brightness": self.visual_brightness[sample_indices],
+            "audio_volume": self.audio_volume[sample_indices],
+            "haptic_intensity": self.haptic_intensity[sample_indices],
+            "thermal_temp": self.thermal_temp[sample_indices]
+        }
+        
         filename = f"{title.replace(' ', '_').lower()}.png"
         filepath = os.path.join(self.output_dir, filename)
-        plt.savefig(filepath, dpi=150, bbox_inches='tight')
-        print(f"Visualization saved to {filepath}")
         
-        return filepath
+        if executor is not None:
+            return executor.submit(_render_results, arrays, title, filepath)
+        return _render_results(arrays, title, filepath)
     
-    def save_simulation_data(self):
+    def save_simulation_data(self, prefix="simulation_data"):
         """
         Save the simulation data to a JSON file
         
+        Args:
+            prefix: Filename prefix, so concurrent runs write separate files
+            
         Returns:
             str: Path to saved data file
         """
@@ -652,24 +577,145 @@ class ExerciseSimulator:
         }
         
         # Save phases as strings
-        phase_strings = []
-        for i, phase in enumerate(self.phase_history):
-            if i * 10 % sample_rate == 0 and i * 10 < len(self.time_points):
-                phase_strings.append(phase.name)
+        processed_points = (len(self.time_points) + 9) // 10
+        phase_strings = PHASE_NAMES[self.phase_history[:processed_points:sample_rate // 10]].tolist()
         
         data["controller_output"]["phase"] = phase_strings
         
         # Save to file
-        filename = f"simulation_data_{int(time.time())}.json"
+        filename = f"{prefix}_{int(time.time())}.json"
         filepath = os.path.join(self.output_dir, filename)
         
-        with open(filepath, 'w') as f:
-            json.dump(data, f, indent=2)
+        # orjson writes the same indented layout as json.dump, without the
+        # pure-Python encoder that json uses whenever indent is set
+        with open(filepath, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
         
         print(f"Simulation data saved to {filepath}")
         return filepath
 
-def run_standard_workout_simulation():
+def _render_results(data, title, filepath):
+    """
+    Render and save the simulation results figure
+    
+    Kept at module level and driven purely by plain arrays so that it can be
+    dispatched to a ProcessPoolExecutor.
+    
+    Args:
+        data: Dictionary of simulation arrays built by ExerciseSimulator.visualize_results
+        title: Title for the visualization
+        filepath: Destination path for the PNG file
+        
+    Returns:
+        str: Path to saved visualization file
+    """
+    # Imported here so that runs without plots never load matplotlib
+    import matplotlib
+    matplotlib.use('Agg')  # Non-interactive backend so figures can render in worker processes
+    import matplotlib.pyplot as plt
+    
+    # Downsample long sessions; extra points are not visible at this figure size
+    stride = max(1, len(data["time_points"]) // MAX_PLOT_POINTS)
+    t = data["time_points"][::stride]
+    ts = data["sample_times"]  # Time points processed by the controller
+    
+    # Create figure with one shared x-axis per column
+    fig, axes = plt.subplots(5, 2, sharex='col', figsize=(15, 12), constrained_layout=True)
+    (ax1, ax6), (ax2, ax7), (ax3, ax8), (ax4, ax9), (ax5, ax10) = axes
+    
+    # Plot physiological signals
+    ax1.plot(t, data["heart_rate"][::stride], 'r-', label='Heart Rate (BPM)')
+    ax1.set_ylabel('Heart Rate (BPM)')
+    ax1.set_ylim(data["rest_hr"] - 10, data["max_hr"] + 10)
+    ax1.set_title('Physiological Signals')
+    ax1.grid(True)
+    
+    ax2.plot(t, data["emg_activity"][::stride], 'g-', label='EMG Activity')
+    ax2.set_ylabel('EMG Activity')
+    ax2.set_ylim(0, 1.1)
+    ax2.grid(True)
+    
+    ax3.plot(t, data["acceleration"][::stride], 'b-', label='Acceleration')
+    ax3.set_ylabel('Acceleration')
+    ax3.set_ylim(0, 2.0)
+    ax3.grid(True)
+    
+    ax4.plot(t, data["gsr"][::stride], 'm-', label='GSR')
+    ax4.set_ylabel('GSR')
+    ax4.set_ylim(0, 1.1)
+    ax4.grid(True)
+    
+    ax5.plot(t, data["impedance"][::stride], 'k-', label='Impedance')
+    ax5.set_ylabel('Impedance')
+    ax5.set_xlabel('Time (minutes)')
+    ax5.set_ylim(400, 520)
+    ax5.grid(True)
+    
+    # Plot exercise phases and controller outputs
+    # Phases are only known at the processed points; hold each until the next one.
+    # The step plot only needs the points where the phase changes, plus the last one
+    phase = data["phase"]
+    phase_points = np.append(np.flatnonzero(np.diff(phase, prepend=-1)), len(phase) - 1)
+    ax6.step(data["sample_times"][phase_points], phase[phase_points], 'c-', where='post',
+             linewidth=2)
+    ax6.set_ylabel('Exercise Phase')
+    ax6.set_yticks(range(5))
+    ax6.set_yticklabels(['Warmup', 'Main', 'Peak', 'Cooldown', 'Recovery'])
+    ax6.set_title('Controller Response')
+    ax6.grid(True)
+    
+    ax7.plot(ts, data["fatigue"], 'r-', label='Fatigue')
+    ax7.plot(ts, data["intensity"], 'b-', label='Intensity')
+    ax7.set_ylabel('Level')
+    ax7.set_ylim(0, 1.1)
+    ax7.legend()
+    ax7.grid(True)
+    
+    # Plot TENS parameters
+    ax8.plot(ts, data["tens_frequency"], 'g-', label='Frequency')
+    ax8_twin = ax8.twinx()
+    ax8_twin.plot(ts, data["tens_intensity"] * 100, 'r-', label='Intensity %')
+    ax8.set_ylabel('TENS Frequency (Hz)')
+    ax8_twin.set_ylabel('TENS Intensity (%)')
+    ax8.set_ylim(0, 60)
+    ax8_twin.set_ylim(0, 100)
+    ax8.grid(True)
+    
+    # Create custom legend
+    lines1, labels1 = ax8.get_legend_handles_labels()
+    lines2, labels2 = ax8_twin.get_legend_handles_labels()
+    ax8.legend(lines1 + lines2, labels1 + labels2, loc='upper right')
+    
+    # Plot other stimulation parameters
+    ax9.plot(ts, data["visual_brightness"] * 100, 'b-', label='Visual')
+    ax9.plot(ts, data["audio_volume"] * 100, 'g-', label='Audio')
+    ax9.plot(ts, data["haptic_intensity"] * 100, 'r-', label='Haptic')
+    ax9.set_ylabel('Intensity (%)')
+    ax9.set_ylim(0, 100)
+    ax9.legend()
+    ax9.grid(True)
+    
+    ax10.plot(ts, data["thermal_temp"], 'c-')
+    ax10.set_ylabel('Temperature (°C)')
+    ax10.set_xlabel('Time (minutes)')
+    ax10.set_ylim(25, 37)
+    ax10.grid(True)
+    
+    # Set common x-axis properties
+    for ax in axes.flat:
+        ax.set_xlim(0, data["duration"])
+    
+    fig.suptitle(title, fontsize=16)
+    
+    # Save the figure
+    fig.savefig(filepath, dpi=80)
+    print(f"Visualization saved to {filepath}")
+    
+    plt.close(fig)
+    
+    return filepath
+
+def run_standard_workout_simulation(executor=None, plot_results=True, seed=DEFAULT_SEED):
     """Run a simulation of a standard workout"""
     user_profile = {
         "max_heart_rate": 185,
@@ -681,12 +727,15 @@ def run_standard_workout_simulation():
         "fatigue_threshold": 0.8
     }
     
-    simulator = ExerciseSimulator(user_profile, duration_minutes=45)
+    simulator = ExerciseSimulator(user_profile, duration_minutes=45, seed=seed)
     simulator.generate_standard_workout().run_simulation()
-    simulator.visualize_results("Standard Workout Simulation")
-    simulator.save_simulation_data()
+    result = None
+    if plot_results:
+        result = simulator.visualize_results("Standard Workout Simulation", executor)
+    simulator.save_simulation_data("standard_simulation_data")
+    return result
     
-def run_hiit_workout_simulation():
+def run_hiit_workout_simulation(executor=None, plot_results=True, seed=DEFAULT_SEED):
     """Run a simulation of a HIIT workout"""
     user_profile = {
         "max_heart_rate": 190,
@@ -698,12 +747,15 @@ def run_hiit_workout_simulation():
         "fatigue_threshold": 0.9
     }
     
-    simulator = ExerciseSimulator(user_profile, duration_minutes=30)
+    simulator = ExerciseSimulator(user_profile, duration_minutes=30, seed=seed)
     simulator.generate_hiit_workout().run_simulation()
-    simulator.visualize_results("HIIT Workout Simulation")
-    simulator.save_simulation_data()
+    result = None
+    if plot_results:
+        result = simulator.visualize_results("HIIT Workout Simulation", executor)
+    simulator.save_simulation_data("hiit_simulation_data")
+    return result
     
-def run_endurance_workout_simulation():
+def run_endurance_workout_simulation(executor=None, plot_results=True, seed=DEFAULT_SEED):
     """Run a simulation of an endurance workout"""
     user_profile = {
         "max_heart_rate": 180,
@@ -715,23 +767,26 @@ def run_endurance_workout_simulation():
         "fatigue_threshold": 0.7
     }
     
-    simulator = ExerciseSimulator(user_profile, duration_minutes=90)
+    simulator = ExerciseSimulator(user_profile, duration_minutes=90, seed=seed)
     simulator.generate_endurance_workout().run_simulation()
-    simulator.visualize_results("Endurance Workout Simulation")
-    simulator.save_simulation_data()
+    result = None
+    if plot_results:
+        result = simulator.visualize_results("Endurance Workout Simulation", executor)
+    simulator.save_simulation_data("endurance_simulation_data")
+    return result
 
 if __name__ == "__main__":
-    # Ensure output directory exists
-    os.makedirs("output", exist_ok=True)
-    
-    # Run the simulations
-    print("\n=== Running Standard Workout Simulation ===")
-    run_standard_workout_simulation()
-    
-    print("\n=== Running HIIT Workout Simulation ===")
-    run_hiit_workout_simulation()
-    
-    print("\n=== Running Endurance Workout Simulation ===")
-    run_endurance_workout_simulation()
+    # The workouts are independent, so run each one (including its figure)
+    # in its own process
+    with ProcessPoolExecutor(max_workers=3) as executor:
+        print("\n=== Running Standard, HIIT and Endurance Workout Simulations ===")
+        futures = [
+            executor.submit(run_standard_workout_simulation),
+            executor.submit(run_hiit_workout_simulation),
+            executor.submit(run_endurance_workout_simulation)
+        ]
+        
+        for future in as_completed(futures):
+            future.result()
     
     print("\nAll simulations complete. Results saved to the 'output' directory.")
@@ -10,13 +10,26 @@ Copyright (c) 2024 Ucaretron Inc.
 from flask import Flask, render_template, request, jsonify
 import json
 import os
-import random
 import time
+import zlib
 import numpy as np
-from datetime import datetime, timedelta
+import orjson
+from datetime import date, datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
+from numba import njit
 
 app = Flask(__name__)
 
+# Random number generator for simulated device readings
+RNG = np.random.default_rng()
+
+# Worker threads for generating several sessions per request
+SESSION_POOL = ThreadPoolExecutor(max_workers=4)
+
+# Artificial delay (seconds) for device control commands, e.g. for UI testing
+app.config.setdefault('SIMULATED_LATENCY', 0.0)
+
 # Sample user profiles
 USERS = {
     "user1": {
@@ -100,213 +113,312 @@ EXERCISE_TYPES = {
     }
 }
 
-# Sample session data
-def generate_session_data(user_id, session_id):
-    """Generate sample data for a specific exercise session"""
-    user = USERS[user_id]
-    exercise_type = user["exercise_type"]
+# EXERCISE_TYPES never changes, so its JSON body is serialized once
+EXERCISE_TYPES_JSON = orjson.dumps(EXERCISE_TYPES)
+
+# Longest generated session in minutes
+MAX_SESSION_MINUTES = 60
+
+# Most session summaries returned by one request, so a large count cannot
+# make a single request allocate without bound
+MAX_SESSIONS_PER_REQUEST = 100
+
+# sin(minute / 5) and sin(minute / 8) for every session minute, sliced per session
+WAVE_5 = np.sin(np.arange(MAX_SESSION_MINUTES) / 5)
+WAVE_8 = np.sin(np.arange(MAX_SESSION_MINUTES) / 8)
+
+# Shape of a generated session for each exercise type. The main workout repeats
+# a cycle whose first minutes are high intensity; steady types have a 1-minute
+# cycle that is always high. Heart rate is a fraction of heart rate reserve
+# given as (base, noise amplitude), plus wave amplitude times the "wave" table.
+# TENS values are (frequency, intensity, pulse width); ramps are (start, step)
+# per minute from the session edge.
+SESSION_PROFILES = {
+    "strength": {
+        "cycle": (10, 3),  # Cycle length, high intensity minutes
+        "wave": None,
+        "hr_high": (0.6, 0.1),
+        "hr_low": (0.4, 0.05),
+        "hr_wave": 0.0,
+        "hr_ramp": 0.3,
+        "tens_high": (80, 70, 250),
+        "tens_low": (40, 40, 200),
+        "tens_wave": (0, 0),
+        "tens_jitter": (5, 5, 10),
+        "tens_ramp": ((20, 2), (30, 4), (150, 10))
+    },
+    "cardio": {
+        "cycle": (1, 1),
+        "wave": WAVE_5,
+        "hr_high": (0.6, 0.03),
+        "hr_low": (0.6, 0.03),
+        "hr_wave": 0.05,
+        "hr_ramp": 0.4,
+        "tens_high": (40, 50, 200),
+        "tens_low": (40, 50, 200),
+        "tens_wave": (5, 5),
+        "tens_jitter": (3, 3, 10),
+        "tens_ramp": ((15, 3), (25, 3), (150, 10))
+    },
+    "rehab": {
+        "cycle": (1, 1),
+        "wave": WAVE_8,
+        "hr_high": (0.3, 0.02),
+        "hr_low": (0.3, 0.02),
+        "hr_wave": 0.1,
+        "hr_ramp": 0.2,
+        "tens_high": (10, 30, 250),
+        "tens_low": (10, 30, 250),
+        "tens_wave": (20, 10),
+        "tens_jitter": (2, 2, 10),
+        "tens_ramp": ((5, 1), (20, 2), (200, 10))
+    },
+    "hiit": {
+        "cycle": (6, 2),
+        "wave": None,
+        "hr_high": (0.8, 0.1),
+        "hr_low": (0.5, 0.05),
+        "hr_wave": 0.0,
+        "hr_ramp": 0.3,
+        "tens_high": (90, 80, 200),
+        "tens_low": (30, 40, 250),
+        "tens_wave": (0, 0),
+        "tens_jitter": (5, 5, 10),
+        "tens_ramp": ((10, 4), (20, 4), (150, 10))
+    }
+}
+
+# Warmup/cooldown ramps, indexed by minutes from the start or end of a session
+RAMP_MINUTES = np.arange(5)
+
+# Heart rate ramps as a fraction of heart rate reserve
+HR_RAMPS = {
+    name: profile["hr_ramp"] * (RAMP_MINUTES / 5)
+    for name, profile in SESSION_PROFILES.items()
+}
+
+# TENS frequency, intensity and pulse width ramps
+TENS_RAMPS = {
+    name: tuple(start + RAMP_MINUTES * step for start, step in profile["tens_ramp"])
+    for name, profile in SESSION_PROFILES.items()
+}
+
+# MET values by exercise type (simplified)
+MET_VALUES = {
+    "strength": 5.0,
+    "cardio": 7.0,
+    "flexibility": 3.0,
+    "rehab": 3.5,
+    "hiit": 8.0
+}
+
+GENDER_FACTOR = 0.9  # Simplified factor for calorie estimates
+
+# Per-minute series in generated session data, kept as NumPy arrays
+SESSION_SERIES = ("heart_rate", "emg", "tens_frequency", "tens_intensity", "tens_pulse_width")
+
+def _session_profile(exercise_type):
+    """Name of the session profile for an exercise type (HIIT for types without one)"""
+    return exercise_type if exercise_type in SESSION_PROFILES else "hiit"
+
+@lru_cache(maxsize=None)
+def _high_intensity_minutes(profile_name, duration):
+    """Read-only mask of the high intensity minutes of a session, shared between calls"""
+    cycle_length, high_minutes = SESSION_PROFILES[profile_name]["cycle"]
+    mask = np.arange(duration) % cycle_length < high_minutes
+    mask.flags.writeable = False
+    return mask
+
+def _apply_ramp(values, ramp):
+    """Overwrite the warmup and cooldown minutes of a session series with a ramp"""
+    values[:5] = ramp
+    values[-4:] = ramp[4:0:-1]  # Cooldown ends one minute from the session edge
+    return values
+
+# Explicit signature so the kernel is compiled at import, not on the first request.
+# Sessions are generated on SESSION_POOL threads, so the kernel releases the GIL
+@njit("int64[:](float64[:], int64, int64)", cache=True, nogil=True)
+def _hr_zones(heart_rate, rest_hr, max_hr):
+    """
+    Count the minutes spent in each heart rate zone
+    
+    Args:
+        heart_rate: Per-minute heart rate array
+        rest_hr: Resting heart rate of the user
+        max_hr: Maximum heart rate of the user
+        
+    Returns:
+        ndarray: Minutes in the easy, fat burn, cardio and peak zones
+    """
+    span = max_hr - rest_hr
+    zones = np.zeros(4, dtype=np.int64)
+    for hr in heart_rate:
+        hr_percent = (hr - rest_hr) / span
+        if hr_percent < 0.6:
+            zones[0] += 1
+        elif hr_percent < 0.7:
+            zones[1] += 1
+        elif hr_percent < 0.8:
+            zones[2] += 1
+        else:
+            zones[3] += 1
+    return zones
+
+def _session_rng(user_id, session_id):
+    """Random generator seeded by user and session so sample data is reproducible"""
+    return np.random.default_rng([zlib.crc32(user_id.encode()), session_id])
+
+def _session_heart_rate(user, rng):
+    """
+    Draw the duration, effectiveness score and heart rate of a session
+    
+    Both the full session data and the session summary start here, so they
+    agree as long as they use generators with the same seed.
+    
+    Args:
+        user: User profile from USERS
+        rng: Generator returned by _session_rng
+        
+    Returns:
+        tuple: (duration in minutes, effectiveness score, per-minute heart rate array)
+    """
+    profile_name = _session_profile(user["exercise_type"])
+    profile = SESSION_PROFILES[profile_name]
     
     # Random session duration between 30-60 minutes
-    duration = random.randint(30, 60)
+    duration = int(rng.integers(30, MAX_SESSION_MINUTES + 1))
     
-    # Generate timestamps (one per minute)
-    timestamps = [(datetime.now() - timedelta(days=session_id)).strftime("%Y-%m-%d %H:%M:%S")]
-    for i in range(1, duration):
-        timestamps.append((datetime.now() - timedelta(days=session_id) + timedelta(minutes=i)).strftime("%Y-%m-%d %H:%M:%S"))
+    # Effectiveness score (0-100)
+    effectiveness = int(rng.integers(80, 99))
     
     # Heart rate pattern depends on exercise type
-    heart_rate = []
     rest_hr = user["resting_heart_rate"]
     max_hr = user["max_heart_rate"]
     
-    if exercise_type == "strength":
-        # Strength training: intervals with recovery
-        for i in range(duration):
-            if i < 5:  # Warmup
-                hr = rest_hr + (max_hr - rest_hr) * 0.3 * (i / 5)
-            elif i > duration - 5:  # Cooldown
-                cool_idx = duration - i
-                hr = rest_hr + (max_hr - rest_hr) * 0.3 * (cool_idx / 5)
-            else:  # Main workout
-                cycle = i % 10
-                if cycle < 3:  # High intensity
-                    hr = rest_hr + (max_hr - rest_hr) * (0.6 + 0.1 * random.random())
-                else:  # Recovery
-                    hr = rest_hr + (max_hr - rest_hr) * (0.4 + 0.05 * random.random())
-            heart_rate.append(round(hr))
-    
-    elif exercise_type == "cardio":
-        # Cardio: steady state with small variations
-        for i in range(duration):
-            if i < 5:  # Warmup
-                hr = rest_hr + (max_hr - rest_hr) * 0.4 * (i / 5)
-            elif i > duration - 5:  # Cooldown
-                cool_idx = duration - i
-                hr = rest_hr + (max_hr - rest_hr) * 0.4 * (cool_idx / 5)
-            else:  # Main workout
-                hr = rest_hr + (max_hr - rest_hr) * (0.6 + 0.05 * np.sin(i/5) + 0.03 * random.random())
-            heart_rate.append(round(hr))
-    
-    elif exercise_type == "rehab":
-        # Rehab: controlled lower intensity
-        for i in range(duration):
-            if i < 5:  # Warmup
-                hr = rest_hr + (max_hr - rest_hr) * 0.2 * (i / 5)
-            elif i > duration - 5:  # Cooldown
-                cool_idx = duration - i
-                hr = rest_hr + (max_hr - rest_hr) * 0.2 * (cool_idx / 5)
-            else:  # Main workout
-                hr = rest_hr + (max_hr - rest_hr) * (0.3 + 0.1 * np.sin(i/8) + 0.02 * random.random())
-            heart_rate.append(round(hr))
-    
-    else:  # Default/HIIT
-        # HIIT pattern
-        for i in range(duration):
-            if i < 5:  # Warmup
-                hr = rest_hr + (max_hr - rest_hr) * 0.3 * (i / 5)
-            elif i > duration - 5:  # Cooldown
-                cool_idx = duration - i
-                hr = rest_hr + (max_hr - rest_hr) * 0.3 * (cool_idx / 5)
-            else:  # Main workout
-                cycle = i % 6
-                if cycle < 2:  # High intensity
-                    hr = rest_hr + (max_hr - rest_hr) * (0.8 + 0.1 * random.random())
-                else:  # Recovery
-                    hr = rest_hr + (max_hr - rest_hr) * (0.5 + 0.05 * random.random())
-            heart_rate.append(round(hr))
+    # Draw the random noise for the whole session at once
+    hr_noise = rng.random(duration)
+    
+    high_intensity = _high_intensity_minutes(profile_name, duration)
+    
+    # Main workout: high/low intensity blocks with an optional steady wave
+    hr_base = np.where(high_intensity, profile["hr_high"][0], profile["hr_low"][0])
+    hr_noise_amplitude = np.where(high_intensity, profile["hr_high"][1], profile["hr_low"][1])
+    if profile["wave"] is not None:
+        hr_base = hr_base + profile["hr_wave"] * profile["wave"][:duration]
+    hr = hr_base + hr_noise_amplitude * hr_noise
+    
+    # Warmup and cooldown
+    _apply_ramp(hr, HR_RAMPS[profile_name])
+    
+    return duration, effectiveness, np.rint(rest_hr + (max_hr - rest_hr) * hr)
+
+def _session_calories(user, duration):
+    """Calories burned in a session (simplified MET model)"""
+    met = MET_VALUES.get(user["exercise_type"], 5.0)
+    calories_per_minute = (met * 3.5 * user["weight"] * GENDER_FACTOR) / 200
+    return round(calories_per_minute * duration)
+
+# Sample session data
+def generate_session_data(user_id, session_id):
+    """Generate sample data for a specific exercise session"""
+    return _copy_session(_generate_session_data_cached(user_id, session_id, date.today()))
+
+def _copy_session(session):
+    """
+    Copy a cached session so that callers can modify it
+    
+    The dict, timestamp list and zone dict are copied; the series arrays are
+    read-only and are shared with the cache.
+    """
+    session = dict(session)
+    session["timestamps"] = list(session["timestamps"])
+    session["hr_zone_minutes"] = dict(session["hr_zone_minutes"])
+    return session
+
+@lru_cache(maxsize=1024)
+def _generate_session_data_cached(user_id, session_id, today):
+    """
+    Generate and memoize the sample data for one session
+    
+    The data is drawn from a generator seeded by the user and session, so a
+    cached entry is identical to a fresh one. The current date is part of the
+    cache key so that session dates roll over at midnight.
+    """
+    user = USERS[user_id]
+    exercise_type = user["exercise_type"]
+    rest_hr = user["resting_heart_rate"]
+    max_hr = user["max_heart_rate"]
+    hr_span = max_hr - rest_hr
+    
+    # Duration, effectiveness score and heart rate pattern
+    rng = _session_rng(user_id, session_id)
+    duration, effectiveness, hr = _session_heart_rate(user, rng)
+    heart_rate = hr.astype(int)
+    
+    # Minute index shared by all signals
+    minutes = np.arange(duration)
+    
+    # Generate timestamps (one per minute), formatted in a single pass
+    start = datetime.now() - timedelta(days=session_id)
+    stamps = np.datetime64(start, 's') + minutes.astype('timedelta64[m]')
+    timestamps = np.char.replace(np.datetime_as_string(stamps), 'T', ' ').tolist()
     
     # Generate EMG activity data based on heart rate
-    emg = []
-    for hr in heart_rate:
-        hr_norm = (hr - rest_hr) / (max_hr - rest_hr)
-        emg_val = hr_norm * 0.8 + 0.1 * random.random()
-        emg.append(round(emg_val * 100))
+    hr_norm = (hr - rest_hr) / hr_span
+    emg_val = hr_norm * 0.8 + 0.1 * rng.random(duration)
+    emg = np.rint(emg_val * 100).astype(int)
     
     # Generate TENS parameters
-    tens_frequency = []
-    tens_intensity = []
-    tens_pulse_width = []
-    
-    for i in range(duration):
-        if exercise_type == "strength":
-            if i < 5:  # Warmup
-                tens_frequency.append(20 + i * 2)
-                tens_intensity.append(int(30 + i * 4))
-                tens_pulse_width.append(150 + i * 10)
-            elif i > duration - 5:  # Cooldown
-                cool_idx = duration - i
-                tens_frequency.append(20 + cool_idx * 2)
-                tens_intensity.append(int(30 + cool_idx * 4))
-                tens_pulse_width.append(150 + cool_idx * 10)
-            else:
-                cycle = i % 10
-                if cycle < 3:  # Active
-                    tens_frequency.append(80 + random.randint(-5, 5))
-                    tens_intensity.append(70 + random.randint(-5, 5))
-                    tens_pulse_width.append(250 + random.randint(-10, 10))
-                else:  # Recovery
-                    tens_frequency.append(40 + random.randint(-5, 5))
-                    tens_intensity.append(40 + random.randint(-5, 5))
-                    tens_pulse_width.append(200 + random.randint(-10, 10))
-        
-        elif exercise_type == "cardio":
-            if i < 5:  # Warmup
-                tens_frequency.append(15 + i * 3)
-                tens_intensity.append(int(25 + i * 3))
-                tens_pulse_width.append(150 + i * 10)
-            elif i > duration - 5:  # Cooldown
-                cool_idx = duration - i
-                tens_frequency.append(15 + cool_idx * 3)
-                tens_intensity.append(int(25 + cool_idx * 3))
-                tens_pulse_width.append(150 + cool_idx * 10)
-            else:
-                tens_frequency.append(40 + 5 * np.sin(i/5) + random.randint(-3, 3))
-                tens_intensity.append(50 + int(5 * np.sin(i/5)) + random.randint(-3, 3))
-                tens_pulse_width.append(200 + random.randint(-10, 10))
-        
-        elif exercise_type == "rehab":
-            if i < 5:  # Warmup
-                tens_frequency.append(5 + i * 1)
-                tens_intensity.append(int(20 + i * 2))
-                tens_pulse_width.append(200 + i * 10)
-            elif i > duration - 5:  # Cooldown
-                cool_idx = duration - i
-                tens_frequency.append(5 + cool_idx * 1)
-                tens_intensity.append(int(20 + cool_idx * 2))
-                tens_pulse_width.append(200 + cool_idx * 10)
-            else:
-                tens_frequency.append(10 + 20 * np.sin(i/8) + random.randint(-2, 2))
-                tens_intensity.append(30 + int(10 * np.sin(i/8)) + random.randint(-2, 2))
-                tens_pulse_width.append(250 + random.randint(-10, 10))
-        
-        else:  # Default/HIIT
-            if i < 5:  # Warmup
-                tens_frequency.append(10 + i * 4)
-                tens_intensity.append(int(20 + i * 4))
-                tens_pulse_width.append(150 + i * 10)
-            elif i > duration - 5:  # Cooldown
-                cool_idx = duration - i
-                tens_frequency.append(10 + cool_idx * 4)
-                tens_intensity.append(int(20 + cool_idx * 4))
-                tens_pulse_width.append(150 + cool_idx * 10)
-            else:
-                cycle = i % 6
-                if cycle < 2:  # High intensity
-                    tens_frequency.append(90 + random.randint(-5, 5))
-                    tens_intensity.append(80 + random.randint(-5, 5))
-                    tens_pulse_width.append(200 + random.randint(-10, 10))
-                else:  # Recovery
-                    tens_frequency.append(30 + random.randint(-5, 5))
-                    tens_intensity.append(40 + random.randint(-5, 5))
-                    tens_pulse_width.append(250 + random.randint(-10, 10))
+    profile_name = _session_profile(exercise_type)
+    profile = SESSION_PROFILES[profile_name]
+    high_intensity = _high_intensity_minutes(profile_name, duration)
     
-    # Calculate calories burned (simplified model)
-    weight_kg = user["weight"]
-    age = user["age"]
-    gender_factor = 0.9  # Simplified factor
-    
-    # MET values by exercise type (simplified)
-    met_values = {
-        "strength": 5.0,
-        "cardio": 7.0,
-        "flexibility": 3.0,
-        "rehab": 3.5,
-        "hiit": 8.0
-    }
+    tens_frequency, tens_intensity, tens_pulse_width = (
+        np.where(high_intensity, high, low)
+        for high, low in zip(profile["tens_high"], profile["tens_low"])
+    )
+    if profile["wave"] is not None:
+        wave = profile["wave"][:duration]
+        frequency_wave, intensity_wave = profile["tens_wave"]
+        tens_frequency = tens_frequency + frequency_wave * wave
+        tens_intensity = tens_intensity + (intensity_wave * wave).astype(int)
     
-    met = met_values.get(exercise_type, 5.0)
-    calories_per_minute = (met * 3.5 * weight_kg * gender_factor) / 200
-    total_calories = round(calories_per_minute * duration)
+    # One (duration, 3) draw gives the frequency, intensity and pulse width jitter
+    jitter_amplitude = np.array(profile["tens_jitter"])
+    jitter = rng.integers(-jitter_amplitude, jitter_amplitude + 1, size=(duration, 3))
+    tens_frequency = tens_frequency + jitter[:, 0]
+    tens_intensity = tens_intensity + jitter[:, 1]
+    tens_pulse_width = tens_pulse_width + jitter[:, 2]
+    
+    # Warmup and cooldown
+    ramp_frequency, ramp_intensity, ramp_pulse_width = TENS_RAMPS[profile_name]
+    tens_frequency = _apply_ramp(tens_frequency, ramp_frequency)
+    tens_intensity = _apply_ramp(tens_intensity, ramp_intensity)
+    tens_pulse_width = _apply_ramp(tens_pulse_width, ramp_pulse_width)
+    
+    # Calculate calories burned (simplified model)
+    total_calories = _session_calories(user, duration)
     
     # Calculate metrics
-    avg_heart_rate = round(sum(heart_rate) / len(heart_rate))
-    max_heart_rate_session = max(heart_rate)
+    avg_heart_rate = round(float(heart_rate.mean()))
+    max_heart_rate_session = int(heart_rate.max())
+    easy, fat_burn, cardio, peak = _hr_zones(hr, rest_hr, max_hr).tolist()
     hr_zone_minutes = {
-        "easy": 0,
-        "fat_burn": 0,
-        "cardio": 0,
-        "peak": 0
+        "easy": easy,
+        "fat_burn": fat_burn,
+        "cardio": cardio,
+        "peak": peak
     }
     
-    for hr in heart_rate:
-        hr_percent = (hr - rest_hr) / (max_hr - rest_hr)
-        if hr_percent < 0.6:
-            hr_zone_minutes["easy"] += 1
-        elif hr_percent < 0.7:
-            hr_zone_minutes["fat_burn"] += 1
-        elif hr_percent < 0.8:
-            hr_zone_minutes["cardio"] += 1
-        else:
-            hr_zone_minutes["peak"] += 1
-    
-    # Effectiveness score (0-100)
-    effectiveness = random.randint(80, 98)
+    # The series arrays are shared by every copy of the cached session, so make them read-only
+    for series in (heart_rate, emg, tens_frequency, tens_intensity, tens_pulse_width):
+        series.flags.writeable = False
     
     return {
         "session_id": session_id,
         "user_id": user_id,
         "user_name": user["name"],
-        "date": (datetime.now() - timedelta(days=session_id)).strftime("%Y-%m-%d"),
+        "date": start.strftime("%Y-%m-%d"),
         "duration": duration,
         "exercise_type": exercise_type,
         "timestamps": timestamps,
@@ -322,14 +434,46 @@ def generate_session_data(user_id, session_id):
         "effectiveness": effectiveness
     }
 
+def generate_session_summary(user_id, session_id):
+    """
+    Generate only the summary fields of a session
+    
+    Matches the corresponding fields of generate_session_data, but skips the
+    timestamps, EMG, TENS series and zone statistics.
+    """
+    user = USERS[user_id]
+    duration, effectiveness, hr = _session_heart_rate(user, _session_rng(user_id, session_id))
+    
+    return {
+        "session_id": session_id,
+        "date": (datetime.now() - timedelta(days=session_id)).strftime("%Y-%m-%d"),
+        "duration": duration,
+        "exercise_type": user["exercise_type"],
+        "calories": _session_calories(user, duration),
+        "avg_heart_rate": round(float(hr.mean())),
+        "effectiveness": effectiveness
+    }
+
+def ojsonify(obj):
+    """Build a JSON response with orjson, which also serializes NumPy arrays directly"""
+    return app.response_class(orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY),
+                              mimetype='application/json')
+
+def _map_sessions(generate, user_id, count):
+    """Apply a session generator to a user's most recent sessions"""
+    session_ids = range(1, count+1)
+    
+    # Only hand larger batches to the thread pool; small ones are cheaper inline
+    if count < 4:
+        return [generate(user_id, i) for i in session_ids]
+    return list(SESSION_POOL.map(partial(generate, user_id), session_ids))
+
 def get_user_sessions(user_id, count=5):
     """Get the most recent sessions for a user"""
-    sessions = []
-    for i in range(1, count+1):
-        sessions.append(generate_session_data(user_id, i))
-    return sessions
+    return _map_sessions(generate_session_data, user_id, count)
 
 @app.route('/')
+@lru_cache(maxsize=None)  # Static data only, so the page is rendered once
 def index():
     """Render the main dashboard page"""
     return render_template('index.html', users=USERS)
@@ -359,7 +503,7 @@ def api_session(user_id, session_id):
         return jsonify({"error": "User not found"}), 404
     
     session_data = generate_session_data(user_id, session_id)
-    return jsonify(session_data)
+    return ojsonify(session_data)
 
 @app.route('/api/user/<user_id>/sessions')
 def api_user_sessions(user_id):
@@ -367,28 +511,15 @@ def api_user_sessions(user_id):
     if user_id not in USERS:
         return jsonify({"error": "User not found"}), 404
     
-    count = request.args.get('count', 10, type=int)
-    sessions = []
-    
-    for i in range(1, count+1):
-        session_data = generate_session_data(user_id, i)
-        # Simplify for summary view
-        sessions.append({
-            "session_id": session_data["session_id"],
-            "date": session_data["date"],
-            "duration": session_data["duration"],
-            "exercise_type": session_data["exercise_type"],
-            "calories": session_data["calories"],
-            "avg_heart_rate": session_data["avg_heart_rate"],
-            "effectiveness": session_data["effectiveness"]
-        })
+    count = min(request.args.get('count', 10, type=int), MAX_SESSIONS_PER_REQUEST)
+    sessions = _map_sessions(generate_session_summary, user_id, count)
     
     return jsonify(sessions)
 
 @app.route('/api/exercise_types')
 def api_exercise_types():
     """API endpoint to get exercise type information"""
-    return jsonify(EXERCISE_TYPES)
+    return app.response_class(EXERCISE_TYPES_JSON, mimetype='application/json')
 
 @app.route('/session/<user_id>/<int:session_id>')
 def session_details(user_id, session_id):
@@ -396,10 +527,23 @@ def session_details(user_id, session_id):
     if user_id not in USERS:
         return "User not found", 404
     
+    return _render_session_details(user_id, session_id, date.today())
+
+@lru_cache(maxsize=256)
+def _render_session_details(user_id, session_id, today):
+    """
+    Render and memoize the session details page
+    
+    The page depends only on the session data, which is itself cached per
+    day, so it is rendered once per session and day.
+    """
     user = USERS[user_id]
-    session_data = generate_session_data(user_id, session_id)
+    session_data = _copy_session(_generate_session_data_cached(user_id, session_id, today))
     exercise_type = EXERCISE_TYPES.get(session_data["exercise_type"], EXERCISE_TYPES["cardio"])
     
+    # The page embeds the series as JavaScript array literals
+    session_data.update((key, session_data[key].tolist()) for key in SESSION_SERIES)
+    
     return render_template(
         'session_details.html',
         user=user,
@@ -409,6 +553,7 @@ def session_details(user_id, session_id):
     )
 
 @app.route('/device_control')
+@lru_cache(maxsize=None)  # Static data only, so the page is rendered once
 def device_control():
     """Render the device control page"""
     return render_template('device_control.html', users=USERS, exercise_types=EXERCISE_TYPES)
@@ -417,13 +562,14 @@ def device_control():
 def api_device_status():
     """API endpoint to get device status"""
     # Simulate device status information
+    battery_level, signal_strength, sync_age = RNG.integers([60, 70, 5], [101, 101, 61]).tolist()
     return jsonify({
         "connected": True,
-        "battery_level": random.randint(60, 100),
+        "battery_level": battery_level,
         "firmware_version": "v2.3.1",
-        "signal_strength": random.randint(70, 100),
-        "temperature": round(36.5 + random.random() * 0.5, 1),
-        "last_sync": (datetime.now() - timedelta(minutes=random.randint(5, 60))).strftime("%Y-%m-%d %H:%M")
+        "signal_strength": signal_strength,
+        "temperature": round(36.5 + RNG.random() * 0.5, 1),
+        "last_sync": (datetime.now() - timedelta(minutes=sync_age)).strftime("%Y-%m-%d %H:%M")
     })
 
 @app.route('/api/device/control', methods=['POST'])
@@ -435,7 +581,10 @@ def api_device_control():
     command = data.get('command', '')
     parameters = data.get('parameters', {})
     
-    time.sleep(0.5)  # Simulate processing time
+    # Simulate processing time only when explicitly configured
+    latency = app.config['SIMULATED_LATENCY']
+    if latency > 0:
+        time.sleep(latency)
     
     # Return a success response with confirmation
     return jsonify({
@@ -446,4 +595,6 @@ def api_device_control():
     })
 
 if __name__ == '__main__':
-    app.run(debug=True, host='0.0.0.0')
+    # Development server; for production run the app under gunicorn, e.g.
+    #   gunicorn -w 4 -k gthread --threads 8 -b 0.0.0.0:5000 app:app
+    app.run(debug=True, host='0.0.0.0', threaded=True)